@@ -0,0 +1,113 @@
+import argparse
+import random
+import sys
+import time
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import bson
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scraper'))
+
+from dedup import simhash, NearDuplicateIndex
+from db.doc_format import encode_document, get_words
+
+
+def make_crawl(pages: int, length: int, duplicates: float, edits: float,
+               seed: int) -> Tuple[List[Tuple[str, List[str]]], Set[str]]:
+    # Distinct articles interleaved with copies of earlier ones, a share `edits` of tokens replaced
+    rng = random.Random(seed)
+    vocabulary: List[str] = [''.join(rng.choice("abcdefghiklmnoprstu") for _ in range(rng.randint(3, 10)))
+                             for _ in range(5000)]
+    weights: List[float] = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    crawl: List[Tuple[str, List[str]]] = []
+    copies: Set[str] = set()
+    for i in range(pages):
+        path: str = f"/wiki/Page_{i}"
+        if crawl and rng.random() < duplicates:
+            words: List[str] = list(rng.choice(crawl)[1])
+            for _ in range(int(len(words) * edits)):
+                words[rng.randrange(len(words))] = rng.choices(vocabulary, weights=weights)[0]
+            copies.add(path)
+        else:
+            words = rng.choices(vocabulary, weights=weights, k=rng.randint(length // 2, length * 3 // 2))
+        crawl.append((path, words))
+    return crawl, copies
+
+
+def load_html(path: str) -> List[Tuple[str, List[str]]]:
+    from text_enrich import parse_page
+    return [(f"/wiki/{file.stem}", parse_page(file.read_text()).words) for file in sorted(Path(path).glob('*.html'))]
+
+
+def load_mongo(uri: str, database: str) -> List[Tuple[str, List[str]]]:
+    from pymongo import MongoClient
+    return [(record['path'], get_words(record)) for record in MongoClient(uri)[database].DocsStorage.find({})]
+
+
+def deduplicate(fingerprints: List[Tuple[str, Optional[int]]], threshold: int) -> Dict[str, str]:
+    index = NearDuplicateIndex(threshold)
+    duplicates: Dict[str, str] = {}
+    for path, fingerprint in fingerprints:
+        if fingerprint is None:
+            continue
+        original: Optional[str] = index.find(fingerprint, path)
+        if original is not None:
+            duplicates[path] = original
+        else:
+            index.add(fingerprint, path)
+    return duplicates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Near-duplicate pages and storage savings of SimHash dedup on a crawl")
+    parser.add_argument('--corpus', help='Directory of saved *.html pages')
+    parser.add_argument('--mongo', help='MongoDB URI of a saved crawl, read from DocsStorage')
+    parser.add_argument('--database', default='IR')
+    parser.add_argument('--pages', type=int, default=5000, help='Synthetic crawl size')
+    parser.add_argument('--length', type=int, default=500)
+    parser.add_argument('--duplicates', type=float, default=0.15, help='Share of synthetic near-copies')
+    parser.add_argument('--edits', type=float, default=0.01, help='Share of replaced tokens in a near-copy')
+    parser.add_argument('--thresholds', type=int, nargs='+', default=[0, 2, 4, 6])
+    parser.add_argument('--shingle', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    copies: Optional[Set[str]] = None
+    if args.corpus:
+        crawl: List[Tuple[str, List[str]]] = load_html(args.corpus)
+    elif args.mongo:
+        crawl = load_mongo(args.mongo, args.database)
+    else:
+        crawl, copies = make_crawl(args.pages, args.length, args.duplicates, args.edits, args.seed)
+
+    start = time.perf_counter()
+    fingerprints: List[Tuple[str, Optional[int]]] = [(path, simhash(words, args.shingle)) for path, words in crawl]
+    elapsed: float = time.perf_counter() - start
+    print(f"{len(crawl)} pages, fingerprints in {elapsed / len(crawl) * 1e3:.2f} ms per page")
+
+    sizes: Dict[str, int] = {path: len(bson.encode(encode_document("", path, words, "terms")))
+                             for path, words in crawl}
+    postings: Dict[str, int] = {path: len(set(words)) for path, words in crawl}
+    total_size: int = sum(sizes.values())
+    total_postings: int = sum(postings.values())
+
+    for threshold in args.thresholds:
+        start = time.perf_counter()
+        duplicates: Dict[str, str] = deduplicate(fingerprints, threshold)
+        elapsed = time.perf_counter() - start
+        saved_size: int = sum(sizes[path] for path in duplicates)
+        saved_postings: int = sum(postings[path] for path in duplicates)
+        line: str = (f"threshold {threshold}: {len(duplicates) / len(crawl):6.1%} pages deduplicated, "
+                     f"DocsStorage -{saved_size / total_size:6.1%} ({saved_size / 2 ** 20:.1f} MiB), "
+                     f"index postings -{saved_postings / total_postings:6.1%}, "
+                     f"lookup {elapsed / len(crawl) * 1e6:.0f} us per page")
+        if copies is not None:
+            found: int = len(copies & duplicates.keys())
+            line += f", recall {found / max(len(copies), 1):.1%}, false positives {len(duplicates) - found}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
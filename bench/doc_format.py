@@ -0,0 +1,84 @@
+import argparse
+import random
+import sys
+import time
+
+from pathlib import Path
+from typing import Dict, List
+
+import bson
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scraper'))
+
+from db.doc_format import encode_document, get_term_counts, get_words
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    letters: str = "abcdefghijklmnopqrstuvwxyz"
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(3, 12))) for _ in range(size)]
+
+
+def make_corpus(count: int, length: int, vocabulary: List[str], rng: random.Random) -> List[List[str]]:
+    weights: List[float] = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [rng.choices(vocabulary, weights=weights, k=rng.randint(length // 2, length * 3 // 2))
+            for _ in range(count)]
+
+
+def encode_corpus(corpus: List[List[str]], docs_format: str, positions: bool) -> List[Dict]:
+    return [encode_document(f"Title {i}", f"/wiki/Article_{i}", words, docs_format, positions)
+            for i, words in enumerate(corpus)]
+
+
+def check(corpus: List[List[str]], documents: List[Dict], positions: bool) -> None:
+    for words, document in zip(corpus, documents):
+        document = bson.decode(bson.encode(document))
+        assert get_term_counts(document) == get_term_counts({'words': words})
+        if positions:
+            assert get_words(document) == words
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DocsStorage layouts: BSON size and write throughput")
+    parser.add_argument('--documents', type=int, default=2000)
+    parser.add_argument('--length', type=int, default=3000)
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--mongo', help='MongoDB URI to measure real inserts and collection sizes')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    corpus: List[List[str]] = make_corpus(args.documents, args.length, make_vocabulary(args.vocabulary, rng), rng)
+
+    database = None
+    if args.mongo:
+        from pymongo import MongoClient
+        database = MongoClient(args.mongo).IR_bench
+
+    print(f"{'layout':<16}{'bson MB':>10}{'ratio':>8}{'encode docs/s':>16}{'insert docs/s':>16}{'storage MB':>12}")
+    baseline: float = 0
+    for name, docs_format, positions in (("words", "words", False),
+                                         ("terms", "terms", False),
+                                         ("terms+positions", "terms", True)):
+        start: float = time.perf_counter()
+        documents: List[Dict] = encode_corpus(corpus, docs_format, positions)
+        encoded: List[bytes] = [bson.encode(document) for document in documents]
+        encode_rate: float = len(documents) / (time.perf_counter() - start)
+        check(corpus, documents, positions)
+
+        size: int = sum(len(data) for data in encoded)
+        baseline = baseline or size
+        insert_rate: str = "-"
+        storage: str = "-"
+        if database is not None:
+            database.drop_collection(name)
+            start = time.perf_counter()
+            for i in range(0, len(documents), 100):
+                database[name].insert_many(documents[i:i + 100], ordered=False)
+            insert_rate = f"{len(documents) / (time.perf_counter() - start):.0f}"
+            storage = f"{database.command('collStats', name)['storageSize'] / 2 ** 20:.1f}"
+            database.drop_collection(name)
+
+        print(f"{name:<16}{size / 2 ** 20:>10.1f}{size / baseline:>8.2f}{encode_rate:>16.0f}{insert_rate:>16}{storage:>12}")
+
+
+if __name__ == '__main__':
+    main()
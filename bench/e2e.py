@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from bson import ObjectId, json_util
+
+ROOT = Path(__file__).resolve().parents[1]
+COLLECTIONS = ('DocsStorage', 'WordsStorage', 'BigramStorage', 'VisitedURLStorage')
+
+
+def make_word(rng: random.Random) -> str:
+    consonants: str = "bcdfghklmnprstvz"
+    vowels: str = "aeiou"
+    return ''.join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 4)))
+
+
+def make_corpus(pages: int, length: int, vocabulary_size: int, seed: int) -> Dict[str, bytes]:
+    rng = random.Random(seed)
+    vocabulary: List[str] = list(dict.fromkeys(make_word(rng) for _ in range(vocabulary_size)))
+    weights: List[float] = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    corpus: Dict[str, bytes] = {}
+    for i in range(pages):
+        words: List[str] = rng.choices(vocabulary, weights=weights, k=length)
+        sentences: List[str] = [' '.join(words[j:j + 12]).capitalize() + '.' for j in range(0, length, 12)]
+        links: str = ''.join(f'<a href="/wiki/Page_{rng.randrange(pages)}">{rng.choice(vocabulary)}</a> '
+                             for _ in range(20))
+        corpus[f'Page_{i}'] = (f'<html><head><title>Page {i}</title></head><body>'
+                               f'<h1 id="firstHeading">Page {i} {words[0]}</h1><div id="mw-content-text">'
+                               f'<p>{" ".join(sentences)}</p><p>{links}</p></div></body></html>').encode()
+    return corpus
+
+
+def load_corpus(path: str) -> Dict[str, bytes]:
+    return {file.stem: file.read_bytes() for file in sorted(Path(path).glob('*.html'))}
+
+
+def make_queries(documents: List[Dict], count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    queries: List[str] = []
+    while documents and len(queries) < count:
+        words: List[str] = document_terms(rng.choice(documents))
+        if len(words) < 2:
+            continue
+        query: List[str] = rng.sample(words, 2)
+        if rng.random() < 0.5:
+            word: str = query[0]
+            i: int = rng.randrange(len(word))
+            query[0] = word[:i] + rng.choice("aeiou") + word[i + 1:]
+        queries.append(' '.join(query))
+    return queries
+
+
+def document_terms(document: Dict) -> List[str]:
+    return list(document['terms']) if 'terms' in document else list(dict.fromkeys(document['words']))
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def serve(handler) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def corpus_handler(corpus: Dict[str, bytes]):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            if self.path == '/robots.txt':
+                self._reply(200, b"User-agent: *\nAllow: /\n")
+            elif self.path.startswith('/wiki/') and self.path[len('/wiki/'):] in corpus:
+                self._reply(200, corpus[self.path[len('/wiki/'):]])
+            else:
+                self._reply(404, b"not found")
+
+        def _reply(self, status: int, body: bytes) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+def engine_handler(documents: List[Dict]):
+    # Stand-in for the search engine: boolean AND over the crawled documents ranked by term frequency
+    postings: Dict[str, Dict[ObjectId, int]] = {}
+    for document in documents:
+        counts = Counter(document['words']) if 'words' in document \
+            else dict(zip(document['terms'], document['counts']))
+        for term, count in counts.items():
+            postings.setdefault(term, {})[document['_id']] = count
+
+    def search(words: List[str]) -> List[List[int]]:
+        lists: List[Dict[ObjectId, int]] = [postings[word] for word in words if word in postings]
+        found: Set[ObjectId] = set(lists[0]).intersection(*lists[1:]) if lists else set()
+        ranked: List[ObjectId] = sorted(found, key=lambda doc_id: -sum(p[doc_id] for p in lists))[:20]
+        return [list(doc_id.binary) for doc_id in ranked]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body go out as separate writes, keep them from waiting on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            self._reply({'generation': 1})
+
+        def do_POST(self) -> None:
+            body: Dict = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            if self.path == '/search_batch':
+                self._reply({'doc_ids': [search(words) for words in body['queries']], 'generation': 1})
+            else:
+                self._reply({'doc_ids': search(body['words']), 'generation': 1})
+
+        def _reply(self, response: Dict) -> None:
+            body: bytes = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+def use_mongomock() -> None:
+    import mongomock_motor
+    import motor.motor_asyncio
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+
+def run_phase(phase: str, directory: Path, options: Dict, env: Optional[Dict[str, str]] = None) -> Dict:
+    completed = subprocess.run([sys.executable, str(Path(__file__).resolve()), phase, json.dumps(options)],
+                               cwd=directory, env={**os.environ, **(env or {})},
+                               stdout=subprocess.PIPE, check=True)
+    return json.loads(completed.stdout.decode().strip().splitlines()[-1])
+
+
+def crawl_phase(options: Dict) -> Dict:
+    sys.path.insert(0, str(ROOT / 'scraper'))
+    if not options['mongo']:
+        use_mongomock()
+
+    import logging
+    from utils import Settings
+    from scraper import Scraper
+    from db import get_database
+
+    settings = Settings(log_level=logging.WARNING, start_url=options['start_url'], url_base=options['url_base'],
+                        max_scraped_count=options['pages'], rps=options['rps'], state_dir=options['state_dir'],
+                        mongo_uri=options['mongo'] or Settings.mongo_uri, mongo_database=options['database'],
+                        **options['scraper'])
+    scraper = Scraper(settings)
+    database = get_database()
+
+    async def crawl() -> float:
+        for collection in COLLECTIONS:
+            await database.drop_collection(collection)
+        start: float = time.perf_counter()
+        await scraper.run()
+        return time.perf_counter() - start
+
+    elapsed: float = asyncio.run(crawl())
+    stages: Dict[str, Dict[str, float]] = {
+        stage: {'pages': pages, 'ms_per_page': 1e3 * spent / pages if pages else 0.0}
+        for stage, (pages, spent) in scraper.stages.items()
+    }
+
+    if options['dump']:
+        async def dump() -> Dict[str, List[Dict]]:
+            return {collection: await database[collection].find({}).to_list(None) for collection in COLLECTIONS}
+        Path(options['dump']).write_text(json_util.dumps(asyncio.run(dump())))
+
+    return {'pages': scraper.scraped, 'seconds': elapsed, 'pages_per_sec': scraper.scraped / elapsed,
+            'stages': stages}
+
+
+def web_phase(options: Dict) -> Dict:
+    sys.path.insert(0, str(ROOT / 'web'))
+    if not options['mongo']:
+        use_mongomock()
+
+    import app as web
+
+    async def load() -> None:
+        from db import get_database
+        database = get_database()
+        for collection, documents in json_util.loads(Path(options['dump']).read_text()).items():
+            if documents:
+                await database[collection].insert_many(documents)
+
+    async def query() -> Dict:
+        if options['dump']:
+            await load()
+        queries: List[str] = options['queries']
+        latencies: List[float] = []
+        errors: int = 0
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async with web.app.test_app() as test_app:
+            client = test_app.test_client()
+
+            async def one(text: str) -> None:
+                nonlocal errors
+                async with semaphore:
+                    start: float = time.perf_counter()
+                    response = await client.post('/', form={'request': text})
+                    await response.get_data()
+                    latencies.append(time.perf_counter() - start)
+                    errors += response.status_code != 200
+
+            start: float = time.perf_counter()
+            await asyncio.gather(*(one(queries[i % len(queries)]) for i in range(options['requests'])))
+            elapsed: float = time.perf_counter() - start
+
+        stages: Dict[str, Dict[str, float]] = {
+            name: {'count': sum(histogram.counts),
+                   'ms_mean': 1e3 * histogram.sum / max(1, sum(histogram.counts))}
+            for name, histogram in (('spelling', web.SPELLING_SECONDS), ('engine', web.ENGINE_SECONDS),
+                                    ('hydration', web.HYDRATION_SECONDS))
+        }
+        return {'requests': len(latencies), 'errors': errors, 'queries_per_sec': len(latencies) / elapsed,
+                'p50_ms': 1e3 * percentile(latencies, 0.50), 'p95_ms': 1e3 * percentile(latencies, 0.95),
+                'p99_ms': 1e3 * percentile(latencies, 0.99), 'stages': stages,
+                'results_cache': web.results_cache.stats()}
+
+    return asyncio.run(query())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end crawl and query benchmark")
+    parser.add_argument('--corpus', help='Directory of saved <title>.html pages, synthetic corpus by default')
+    parser.add_argument('--pages', type=int, default=200, help='Pages to crawl')
+    parser.add_argument('--page_length', type=int, default=300, help='Words per synthetic page')
+    parser.add_argument('--vocabulary', type=int, default=2000,
+                        help='Synthetic vocabulary size, mongomock scans collections on every upsert so keep it small')
+    parser.add_argument('--mongo', help='MongoDB URI, in-process mongomock by default')
+    parser.add_argument('--database', default='IRBench', help='Database used with --mongo')
+    parser.add_argument('--engine', help='Search engine URL, a stand-in over the crawled documents by default')
+    parser.add_argument('--queries', help='Query log, one JSON object with a "query" field per line')
+    parser.add_argument('--requests', type=int, default=500, help='Search requests to send')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rps', type=int, default=10000, help='Crawl rate limit')
+    parser.add_argument('--scraper', default='{}', help='JSON object of extra scraper Settings')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    corpus: Dict[str, bytes] = load_corpus(args.corpus) if args.corpus \
+        else make_corpus(args.pages * 2, args.page_length, args.vocabulary, args.seed)
+    corpus_server = serve(corpus_handler(corpus))
+    url_base: str = f"http://127.0.0.1:{corpus_server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        dump: str = '' if args.mongo else os.path.join(workdir, 'dump.json')
+        crawl: Dict = run_phase('crawl', ROOT / 'scraper', {
+            'start_url': f"{url_base}/wiki/{next(iter(corpus))}", 'url_base': url_base, 'pages': args.pages,
+            'rps': args.rps, 'state_dir': os.path.join(workdir, 'state'), 'mongo': args.mongo,
+            'database': args.database, 'dump': dump, 'scraper': json.loads(args.scraper),
+        })
+        corpus_server.shutdown()
+
+        if args.mongo:
+            from pymongo import MongoClient
+            documents: List[Dict] = list(MongoClient(args.mongo)[args.database].DocsStorage.find({}))
+        else:
+            documents = json_util.loads(Path(dump).read_text())['DocsStorage']
+
+        engine_server: Optional[ThreadingHTTPServer] = None
+        engine_url: str = args.engine
+        if not engine_url:
+            engine_server = serve(engine_handler(documents))
+            engine_url = f"http://127.0.0.1:{engine_server.server_address[1]}"
+
+        if args.queries:
+            sys.path.insert(0, str(Path(__file__).resolve().parent))
+            from load_test import load_queries
+            queries: List[str] = load_queries(args.queries)
+        else:
+            queries = make_queries(documents, 200, args.seed)
+
+        env: Dict[str, str] = {'SECRET': 'bench', 'ENGINE_URL': engine_url, 'MONGO_DATABASE': args.database}
+        if args.mongo:
+            env['MONGO_URI'] = args.mongo
+        query: Dict = run_phase('web', ROOT / 'web', {
+            'mongo': args.mongo, 'dump': dump, 'queries': queries,
+            'requests': args.requests, 'concurrency': args.concurrency,
+        }, env)
+        if engine_server is not None:
+            engine_server.shutdown()
+
+    commit: str = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                 stdout=subprocess.PIPE).stdout.decode().strip()
+    report: Dict = {'commit': commit, 'corpus': args.corpus or 'synthetic', 'mongo': 'mongod' if args.mongo else 'mongomock',
+                    'engine': args.engine or 'stand-in', 'crawl': crawl, 'query': query}
+    text: str = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] in ('crawl', 'web'):
+        result: Dict = (crawl_phase if sys.argv[1] == 'crawl' else web_phase)(json.loads(sys.argv[2]))
+        print(json.dumps(result))
+    else:
+        main()
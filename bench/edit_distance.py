@@ -0,0 +1,97 @@
+import argparse
+import random
+import string
+import sys
+import time
+
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'web'))
+
+from search_helper.metrics import damerau_levenshtein_distance, damerau_levenshtein_distances
+
+
+def reference_distance(lhs: str, rhs: str) -> float:
+    d: Dict = dict()
+    for i in range(-1, len(lhs) + 1):
+        d[(i, -1)] = i + 1
+    for j in range(-1, len(rhs) + 1):
+        d[(-1, j)] = j + 1
+
+    for i in range(len(lhs)):
+        for j in range(len(rhs)):
+            if lhs[i] == rhs[j]:
+                cost = 0
+            else:
+                cost = 0.9
+            d[(i, j)] = min(
+                d[(i - 1, j)] + 1,
+                d[(i, j - 1)] + 1,
+                d[(i - 1, j - 1)] + cost,
+            )
+            if i and j and lhs[i] == rhs[j - 1] and lhs[i - 1] == rhs[j]:
+                d[(i, j)] = min(d[(i, j)], d[i - 2, j - 2] + 1)
+
+    return d[len(lhs) - 1, len(rhs) - 1]
+
+
+def random_word(rng: random.Random, alphabet: str, max_len: int) -> str:
+    return ''.join(rng.choices(alphabet, k=rng.randint(0, max_len)))
+
+
+def check(rng: random.Random, cases: int, bound: float) -> None:
+    for _ in range(cases):
+        alphabet: str = string.ascii_lowercase[:rng.randint(1, 6)]
+        word: str = random_word(rng, alphabet, 10)
+        candidates: List[str] = [random_word(rng, alphabet, 10) for _ in range(rng.randint(1, 20))]
+        expected: List[float] = [reference_distance(word, c) for c in candidates]
+        batched: List[float] = damerau_levenshtein_distances(word, candidates, bound).tolist()
+        for candidate, e, b in zip(candidates, expected, batched):
+            single: float = damerau_levenshtein_distance(word, candidate, bound)
+            if e <= bound:
+                assert single == e, (word, candidate, single, e)
+                assert abs(b - e) < 1e-9, (word, candidate, b, e)
+            elif not all(v > bound for v in batched):
+                assert single > bound, (word, candidate, single, e)
+                assert abs(b - e) < 1e-9, (word, candidate, b, e)
+            else:
+                assert single > bound and b > bound, (word, candidate, single, b, e)
+    print(f"Checked {cases} random cases against the reference implementation")
+
+
+def bench(name: str, fn, word: str, candidates: List[str], rounds: int) -> None:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(word, candidates)
+    elapsed: float = (time.perf_counter() - start) / rounds
+    print(f"{name:>20}: {elapsed * 1e3:8.3f} ms per word x {len(candidates)} candidates")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Damerau-Levenshtein kernels: reference vs row buffer vs batched")
+    parser.add_argument('--cases', type=int, default=2000)
+    parser.add_argument('--candidates', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--bound', type=float, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    check(rng, args.cases, float('inf'))
+    check(rng, args.cases, args.bound)
+
+    word: str = 'recieving'
+    candidates: List[str] = [random_word(rng, string.ascii_lowercase, 12) for _ in range(args.candidates)]
+    bench("reference", lambda w, cs: [reference_distance(w, c) for c in cs], word, candidates, args.rounds)
+    bench("row buffer", lambda w, cs: [damerau_levenshtein_distance(w, c) for c in cs],
+          word, candidates, args.rounds)
+    bench("row buffer, bounded", lambda w, cs: [damerau_levenshtein_distance(w, c, args.bound) for c in cs],
+          word, candidates, args.rounds)
+    bench("batched", lambda w, cs: damerau_levenshtein_distances(w, cs), word, candidates, args.rounds)
+    bench("batched, bounded", lambda w, cs: damerau_levenshtein_distances(w, cs, args.bound),
+          word, candidates, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
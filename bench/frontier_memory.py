@@ -0,0 +1,56 @@
+import argparse
+import sys
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import List, Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scraper'))
+
+from bucket_queue.bloom import BloomFilter
+
+
+def make_url(i: int) -> str:
+    return f"https://en.wikipedia.org/wiki/Article_{i:08d}"
+
+
+def set_footprint(count: int) -> int:
+    tracemalloc.start()
+    urls: Set[str] = {make_url(i) for i in range(count)}
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del urls
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Visited set memory: Python set vs Bloom filter")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--error_rate', type=float, default=1e-4)
+    parser.add_argument('--max_measured', type=int, default=1_000_000,
+                        help="Larger sets are extrapolated linearly from this size")
+    parser.add_argument('--insert', type=int, default=200_000, help="URLs inserted to time the Bloom filter")
+    args = parser.parse_args()
+
+    per_url: float = set_footprint(args.max_measured) / args.max_measured
+    for size in args.sizes:
+        measured: bool = size <= args.max_measured
+        set_bytes: float = set_footprint(size) if measured else per_url * size
+        bloom = BloomFilter(capacity=size, error_rate=args.error_rate)
+        print(f"{size:>11,} URLs: set {set_bytes / 2 ** 20:9.1f} MiB{'' if measured else ' (extrapolated)'}, "
+              f"bloom {bloom.nbytes / 2 ** 20:7.1f} MiB ({bloom.hashes} hashes, error rate {args.error_rate})")
+
+    bloom = BloomFilter(capacity=args.insert, error_rate=args.error_rate)
+    urls: List[str] = [make_url(i) for i in range(args.insert)]
+    start = time.perf_counter()
+    for url in urls:
+        bloom.add(url)
+    elapsed: float = time.perf_counter() - start
+    false_positives: int = sum(make_url(i) in bloom for i in range(args.insert, 2 * args.insert))
+    print(f"Bloom filter: {elapsed / args.insert * 1e6:.2f} us per insert, "
+          f"measured false positive rate {false_positives / args.insert:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import sys
+import time
+
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scraper'))
+
+from bs4 import BeautifulSoup
+
+from text_enrich.enrich import get_soup_text
+
+
+def three_parses(html: str, features: str) -> None:
+    get_soup_text(BeautifulSoup(html, features=features))
+    BeautifulSoup(html, features=features).find(id='firstHeading')
+    {a['href'] for a in BeautifulSoup(html, features=features).find_all('a', href=True)}
+
+
+def single_parse(html: str, features: str) -> None:
+    soup = BeautifulSoup(html, features=features)
+    get_soup_text(soup)
+    soup.find(id='firstHeading')
+    [a['href'] for a in soup.find_all('a', href=True)]
+
+
+def bench(name: str, fn: Callable[[str, str], None], corpus: List[str], features: str) -> None:
+    start = time.perf_counter()
+    for html in corpus:
+        fn(html, features)
+    elapsed: float = time.perf_counter() - start
+    print(f"{name:>28}: {elapsed / len(corpus) * 1e3:8.2f} ms per page")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-page HTML extraction time (text, title and links)")
+    parser.add_argument('corpus', help="Directory with saved Wikipedia article HTML files")
+    args = parser.parse_args()
+
+    corpus: List[str] = [p.read_text(encoding='utf-8') for p in sorted(Path(args.corpus).glob('*.html'))]
+    if not corpus:
+        sys.exit(f"No *.html files in {args.corpus}")
+    print(f"{len(corpus)} pages, {sum(map(len, corpus)) / len(corpus) / 1024:.1f} KiB on average")
+
+    bench("three parses, html.parser", three_parses, corpus, "html.parser")
+    bench("single parse, html.parser", single_parse, corpus, "html.parser")
+    bench("single parse, lxml", single_parse, corpus, "lxml")
+
+
+if __name__ == '__main__':
+    main()
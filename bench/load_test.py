@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import json
+import time
+
+from pathlib import Path
+from typing import List
+
+import httpx
+
+DEFAULT_QUERIES: List[str] = [
+    "information retrieval", "serch engine", "moscow university", "machine lerning",
+    "history of russia", "quantum mechanics", "programing language", "world war",
+]
+
+
+def load_queries(path: str) -> List[str]:
+    queries: List[str] = []
+    for line in Path(path).read_text().splitlines():
+        if line.strip():
+            record = json.loads(line)
+            queries.append(record.get('query') or record.get('title') or '')
+    return [q for q in queries if q]
+
+
+async def run_level(url: str, queries: List[str], concurrency: int, total: int, timeout: float) -> None:
+    latencies: List[float] = []
+    errors: int = 0
+    counter = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, data={'request': queries[i % len(queries)]})
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed: float = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"concurrency {concurrency:>3}: {len(latencies) / elapsed:8.2f} req/s, "
+          f"p50 {latencies[len(latencies) // 2] * 1e3:8.1f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1e3:8.1f} ms, errors {errors}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput of the web search route at several concurrency levels")
+    parser.add_argument('--url', default='http://localhost:5000/')
+    parser.add_argument('--queries', help="JSON lines file with 'query' (or 'title') fields")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--requests', type=int, default=256, help="Requests per concurrency level")
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    queries: List[str] = load_queries(args.queries) if args.queries else DEFAULT_QUERIES
+    for concurrency in args.concurrency:
+        asyncio.run(run_level(args.url, queries, concurrency, args.requests, args.timeout))
+
+
+if __name__ == '__main__':
+    main()
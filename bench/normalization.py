@@ -0,0 +1,37 @@
+import argparse
+import sys
+import time
+
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'web'))
+
+from request_enrich import Normalizer, get_enriched_words
+from load_test import DEFAULT_QUERIES, load_queries
+
+
+def bench(name: str, normalize: Callable[[str], List[str]], queries: List[str], rounds: int) -> None:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            normalize(query)
+    elapsed: float = time.perf_counter() - start
+    print(f"{name:>24}: {rounds * len(queries) / elapsed:10.1f} requests/sec")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query normalization throughput")
+    parser.add_argument('--queries', help="JSON lines file with 'query' (or 'title') fields")
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    queries: List[str] = load_queries(args.queries) if args.queries else DEFAULT_QUERIES
+    normalizer = Normalizer()
+
+    bench("per-call setup", get_enriched_words, queries, max(args.rounds // 10, 1))
+    bench("normalizer", normalizer, queries, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
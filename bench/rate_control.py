@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import logging
+import sys
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+from httpx import AsyncClient, Limits
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scraper'))
+
+from utils import Settings
+from rate_control import HostRateControl, fetch
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate: float = rate
+        self.burst: float = burst
+        self.tokens: float = burst
+        self.updated: float = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now: float = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+def make_handler(bucket: TokenBucket, counters: Dict[str, int]):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            if not bucket.take():
+                counters['throttled'] += 1
+                self._reply(429, b"slow down", {'Retry-After': '1'})
+            elif self.path.startswith('/redirect/'):
+                counters['redirects'] += 1
+                self._reply(301, b"", {'Location': '/wiki/' + self.path.rsplit('/', 1)[1]})
+            else:
+                counters['ok'] += 1
+                self._reply(200, b"<html><body>page</body></html>", {})
+
+        def _reply(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+async def crawl(base: str, settings: Settings, duration: float, fetchers: int) -> List[float]:
+    logger = logging.getLogger("bench")
+    hosts = HostRateControl(settings)
+    done: List[float] = []
+    counter = iter(range(10 ** 9))
+    deadline: float = time.monotonic() + duration
+
+    async def worker(client: AsyncClient) -> None:
+        while time.monotonic() < deadline:
+            i: int = next(counter)
+            path: str = f"/redirect/{i}" if i % 10 == 0 else f"/wiki/{i}"
+            if await fetch(client, base + path, hosts, settings, logger) is not None:
+                done.append(time.monotonic())
+
+    async with AsyncClient(limits=Limits(max_connections=fetchers)) as client:
+        await asyncio.gather(*(worker(client) for _ in range(fetchers)))
+    return done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sustained throughput against a throttling stub server")
+    parser.add_argument('--limit', type=float, default=40, help='Server side requests per second')
+    parser.add_argument('--rps', type=int, default=200, help='Client max requests per second')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--fetchers', type=int, default=16)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    for name, min_rps in (("fixed", args.rps), ("adaptive", 1)):
+        counters: Dict[str, int] = {'ok': 0, 'throttled': 0, 'redirects': 0}
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(TokenBucket(args.limit, 5), counters))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base: str = f"http://127.0.0.1:{server.server_address[1]}"
+
+        settings = Settings(rps=args.rps, min_rps=min_rps, max_retries=10, backoff_base=0.1)
+        start: float = time.monotonic()
+        done: List[float] = asyncio.run(crawl(base, settings, args.duration, args.fetchers))
+        server.shutdown()
+        server.server_close()
+
+        steady: int = sum(1 for moment in done if moment - start >= args.duration / 2)
+        print(f"{name:<9} pages {len(done):>6}  steady {2 * steady / args.duration:6.1f} pages/s "
+              f"(limit {args.limit:.0f})  requests {sum(counters.values()):>6}  "
+              f"429 {counters['throttled']:>6}  redirects {counters['redirects']:>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import logging
+import sys
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from httpx import AsyncClient, Limits, Response, codes
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scraper'))
+
+from utils import Settings
+from rate_control import HostRateControl, fetch
+from db.url import get_validators
+
+
+def make_handler(page_size: int, counters: Dict[str, int]):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            etag: str = f'"{self.path}-1"'
+            if self.headers.get('If-None-Match') == etag:
+                self._reply(304, b"", etag)
+            else:
+                self._reply(200, (f"<html><body>{self.path} " + "x" * page_size + "</body></html>").encode(), etag)
+
+        def _reply(self, status: int, body: bytes, etag: str) -> None:
+            self.send_response(status)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', 'Mon, 05 Oct 2026 10:00:00 GMT')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            counters['bytes'] += len(body)
+            counters[str(status)] = counters.get(str(status), 0) + 1
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+async def crawl(urls: List[str], settings: Settings, fetchers: int,
+                validators: Dict[str, Dict[str, str]]) -> float:
+    logger = logging.getLogger("bench")
+    hosts = HostRateControl(settings)
+    pending: List[str] = list(reversed(urls))
+
+    async def worker(client: AsyncClient) -> None:
+        while pending:
+            url: str = pending.pop()
+            fields: Dict[str, str] = validators.get(url, {})
+            headers: Dict[str, str] = {}
+            if 'etag' in fields:
+                headers['If-None-Match'] = fields['etag']
+            if 'last_modified' in fields:
+                headers['If-Modified-Since'] = fields['last_modified']
+            response: Optional[Response] = await fetch(client, url, hosts, settings, logger, headers)
+            if response is not None and response.status_code == codes.OK:
+                validators[url] = get_validators(response.headers)
+
+    limits = Limits(max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_keepalive_connections,
+                    keepalive_expiry=settings.keepalive_expiry)
+    start: float = time.monotonic()
+    async with AsyncClient(http2=settings.http2, limits=limits) as client:
+        await asyncio.gather(*(worker(client) for _ in range(fetchers)))
+    return time.monotonic() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Full crawl vs conditional re-crawl of an unchanged corpus")
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--page_size', type=int, default=50_000)
+    parser.add_argument('--fetchers', type=int, default=16)
+    parser.add_argument('--max_connections', type=int, default=Settings.max_connections)
+    parser.add_argument('--max_keepalive_connections', type=int, default=Settings.max_keepalive_connections)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    counters: Dict[str, int] = {'bytes': 0}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.page_size, counters))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls: List[str] = [f"http://127.0.0.1:{server.server_address[1]}/wiki/P{i}" for i in range(args.pages)]
+
+    settings = Settings(rps=100_000, max_connections=args.max_connections,
+                        max_keepalive_connections=args.max_keepalive_connections)
+    validators: Dict[str, Dict[str, str]] = {}
+    for name in ("crawl", "recrawl"):
+        counters.clear()
+        counters['bytes'] = 0
+        elapsed: float = asyncio.run(crawl(urls, settings, args.fetchers, validators))
+        print(f"{name:<8} {args.pages / elapsed:8.1f} pages/s  {counters['bytes'] / 2 ** 20:8.1f} MB body  "
+              f"200: {counters.get('200', 0):>6}  304: {counters.get('304', 0):>6}")
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
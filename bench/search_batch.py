@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from typing import Dict, List
+
+from bson import ObjectId
+
+from e2e import ROOT, make_word, engine_handler, serve
+from load_test import load_queries
+
+sys.path.insert(0, str(ROOT / 'web'))
+
+from engine_client import EngineClient
+
+
+def make_documents(count: int, length: int, vocabulary_size: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    vocabulary: List[str] = list(dict.fromkeys(make_word(rng) for _ in range(vocabulary_size)))
+    weights: List[float] = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [{'_id': ObjectId(), 'words': rng.choices(vocabulary, weights=weights, k=length)} for _ in range(count)]
+
+
+def make_log(documents: List[Dict], count: int, seed: int) -> List[List[str]]:
+    rng = random.Random(seed)
+    return [rng.sample(rng.choice(documents)['words'], rng.randint(1, 3)) for _ in range(count)]
+
+
+async def replay_single(client: EngineClient, queries: List[List[str]], concurrency: int) -> int:
+    found: int = 0
+    counter = iter(queries)
+
+    async def worker() -> None:
+        nonlocal found
+        for words in counter:
+            response: Dict = await client.search(words)
+            found += len(response['doc_ids'])
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return found
+
+
+async def replay_batch(client: EngineClient, queries: List[List[str]]) -> int:
+    return sum(len(doc_ids) for doc_ids in (await client.search_batch(queries))['doc_ids'])
+
+
+async def run(args: argparse.Namespace, engine_url: str, queries: List[List[str]]) -> None:
+    runs: List = [(f"single, concurrency {concurrency}", None, concurrency) for concurrency in args.concurrency]
+    runs += [(f"batch of {batch_size}", batch_size, args.max_connections) for batch_size in args.batch_size]
+    for name, batch_size, connections in runs:
+        async with EngineClient(engine_url, timeout=args.timeout, max_connections=connections,
+                                batch_size=batch_size or 1) as client:
+            start = time.perf_counter()
+            if batch_size is None:
+                found: int = await replay_single(client, queries, connections)
+            else:
+                found = await replay_batch(client, queries)
+            elapsed: float = time.perf_counter() - start
+        print(f"{name:>24}: {len(queries) / elapsed:8.1f} queries/s, {found} doc ids")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a query log against the engine one query per request vs batched")
+    parser.add_argument('--log', help="requests.jsonl-style log with 'query' or 'title' fields")
+    parser.add_argument('--queries', type=int, default=2000, help='Synthetic log size when no --log is given')
+    parser.add_argument('--engine_url', help='Search engine URL, a local stand-in engine by default')
+    parser.add_argument('--documents', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--batch_size', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--max_connections', type=int, default=4, help='Concurrent chunk requests in batch runs')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    documents: List[Dict] = make_documents(args.documents, 200, 2000, args.seed)
+    if args.log:
+        queries: List[List[str]] = [query.lower().split() for query in load_queries(args.log)]
+    else:
+        queries = make_log(documents, args.queries, args.seed)
+
+    server = None
+    engine_url: str = args.engine_url
+    if engine_url is None:
+        server = serve(engine_handler(documents))
+        engine_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"replaying {len(queries)} queries against {engine_url}")
+    asyncio.run(run(args, engine_url, queries))
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Dict, List
+
+from e2e import ROOT, make_corpus, corpus_handler, serve, use_mongomock
+
+
+def shard_process(options: Dict) -> Dict:
+    sys.path.insert(0, str(ROOT / 'scraper'))
+    if not options['mongo']:
+        use_mongomock()
+
+    import asyncio
+    import logging
+    from utils import Settings
+    from scraper import Scraper
+    from db import get_database
+
+    settings = Settings(log_level=logging.WARNING, start_url=options['start_url'], url_base=options['url_base'],
+                        max_scraped_count=options['pages'], rps=options['rps'], state_dir=options['state_dir'],
+                        shards=options['shards'], shard_id=options['shard_id'], workers=options['workers'],
+                        mongo_uri=options['mongo'] or Settings.mongo_uri, mongo_database=options['database'])
+    scraper = Scraper(settings)
+    database = get_database()
+
+    async def crawl() -> List[str]:
+        await scraper.run()
+        return [record['path'] async for record in database.DocsStorage.find({}, {'path': 1})]
+
+    paths: List[str] = asyncio.run(crawl())
+    return {'scraped': scraper.scraped, 'paths': paths if not options['mongo'] else []}
+
+
+def run(shards: int, options: Dict) -> Dict:
+    with tempfile.TemporaryDirectory() as state_dir:
+        start: float = time.perf_counter()
+        processes: List[subprocess.Popen] = [
+            subprocess.Popen([sys.executable, str(Path(__file__).resolve()), 'shard',
+                              json.dumps({**options, 'shards': shards, 'shard_id': shard, 'state_dir': state_dir})],
+                             cwd=ROOT / 'scraper', stdout=subprocess.PIPE)
+            for shard in range(shards)
+        ]
+        results: List[Dict] = [json.loads(process.communicate()[0].decode().strip().splitlines()[-1])
+                               for process in processes]
+        elapsed: float = time.perf_counter() - start
+
+    paths: List[str] = [path for result in results for path in result['paths']]
+    return {'shards': shards, 'pages': sum(result['scraped'] for result in results), 'seconds': elapsed,
+            'per_shard': [result['scraped'] for result in results],
+            'duplicates': len(paths) - len(set(paths))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Crawl throughput against shard count on a local stub site")
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--pages', type=int, default=400, help='Pages to crawl in every run')
+    parser.add_argument('--page_length', type=int, default=300)
+    parser.add_argument('--vocabulary', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=1, help='Enrichment processes per shard')
+    parser.add_argument('--rps', type=int, default=10000, help='Crawl rate limit shared by all shards')
+    parser.add_argument('--mongo', help='MongoDB URI, a mongomock stand-in per shard process by default')
+    parser.add_argument('--database', default='IRBench')
+    args = parser.parse_args()
+
+    corpus: Dict[str, bytes] = make_corpus(args.pages * 4, args.page_length, args.vocabulary, 1)
+    server = serve(corpus_handler(corpus))
+    url_base: str = f"http://127.0.0.1:{server.server_address[1]}"
+    options: Dict = {'start_url': f"{url_base}/wiki/Page_0", 'url_base': url_base, 'pages': args.pages,
+                     'rps': args.rps, 'workers': args.workers, 'mongo': args.mongo, 'database': args.database}
+
+    print(f"cpu count: {os.cpu_count()}")
+    baseline: float = 0
+    for shards in args.shards:
+        if args.mongo:
+            from pymongo import MongoClient
+            MongoClient(args.mongo).drop_database(args.database)
+        result: Dict = run(shards, options)
+        rate: float = result['pages'] / result['seconds']
+        baseline = baseline or rate
+        print(f"shards {shards:>2}: {result['pages']:>5} pages in {result['seconds']:6.1f} s, {rate:7.1f} pages/s, "
+              f"speedup {rate / baseline:4.2f}, per shard {result['per_shard']}, duplicates {result['duplicates']}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == 'shard':
+        print(json.dumps(shard_process(json.loads(sys.argv[2]))))
+    else:
+        main()
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import logging
+import random
+import string
+import sys
+import time
+
+from pathlib import Path
+from typing import Dict, List, Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'web'))
+
+from search_helper import BigramIndex, SpellingIndex
+from search_helper.common import get_bigrams
+
+logger = logging.getLogger(__name__)
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    words: Set[str] = set()
+    letters: str = string.ascii_lowercase
+    weights: List[int] = [8, 2, 3, 4, 12, 2, 2, 6, 7, 1, 1, 4, 2, 7, 8, 2, 1, 6, 6, 9, 3, 1, 2, 1, 2, 1]
+    while len(words) < size:
+        length: int = rng.randint(3, 12)
+        words.add(''.join(rng.choices(letters, weights=weights, k=length)))
+    return sorted(words)
+
+
+def make_typo(word: str, rng: random.Random) -> str:
+    i: int = rng.randrange(len(word))
+    c: str = rng.choice(string.ascii_lowercase)
+    return rng.choice([
+        word[:i] + c + word[i + 1:],
+        word[:i] + word[i + 1:],
+        word[:i] + c + word[i:],
+        word[:i] + word[i + 1:i + 2] + word[i:i + 1] + word[i + 2:],
+    ])
+
+
+def bench_memory(index: SpellingIndex, queries: List[List[str]]) -> List[float]:
+    latencies: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        candidates: Set[str] = set()
+        for word in query:
+            if word not in index:
+                candidates |= index.get_candidates(word)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_build(index: SpellingIndex, queries: List[List[str]]) -> List[float]:
+    latencies: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        BigramIndex(query, index).build(logger)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def bench_mongo(uri: str, vocabulary: List[str], queries: List[List[str]]) -> List[float]:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    db = AsyncIOMotorClient(uri).IRBench
+    await db.WordsStorage.drop()
+    await db.BigramStorage.drop()
+    await db.WordsStorage.insert_many({'word': word} for word in vocabulary)
+    await db.WordsStorage.create_index('word')
+    postings: Dict[str, List[str]] = dict()
+    for word in vocabulary:
+        for bigram in get_bigrams(word):
+            postings.setdefault(bigram, []).append(word)
+    await db.BigramStorage.insert_many({'bigram': b, 'words': w} for b, w in postings.items())
+    await db.BigramStorage.create_index('bigram')
+
+    latencies: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        candidates: Set[str] = set()
+        for word in query:
+            if await db.WordsStorage.count_documents({'word': word}) > 0:
+                continue
+            for bigram in get_bigrams(word):
+                async for record in db.BigramStorage.find({'bigram': bigram}):
+                    candidates.update(record['words'])
+        latencies.append(time.perf_counter() - start)
+
+    await db.client.drop_database('IRBench')
+    return latencies
+
+
+def report(name: str, latencies: List[float]) -> None:
+    latencies = sorted(latencies)
+    p50: float = latencies[len(latencies) // 2]
+    p95: float = latencies[int(len(latencies) * 0.95)]
+    print(f"{name:>26}: p50 {p50 * 1e3:8.2f} ms, p95 {p95 * 1e3:8.2f} ms, "
+          f"mean {sum(latencies) / len(latencies) * 1e3:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Spelling correction latency: in-memory index vs Mongo")
+    parser.add_argument('--words', type=int, default=500_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--query_len', type=int, default=5)
+    parser.add_argument('--mongo', help="MongoDB URI; enables the Mongo-backed candidate fetch")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary: List[str] = make_vocabulary(args.words, rng)
+    queries: List[List[str]] = [[make_typo(rng.choice(vocabulary), rng) for _ in range(args.query_len)]
+                                for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = SpellingIndex()
+    index.add_many(vocabulary)
+    print(f"Built in-memory index of {len(index)} words in {time.perf_counter() - start:.2f} s")
+
+    report("in-memory candidate fetch", bench_memory(index, queries))
+    report("in-memory full build", bench_build(index, queries))
+    if args.mongo:
+        report("mongo candidate fetch", asyncio.run(bench_mongo(args.mongo, vocabulary, queries)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from e2e import ROOT, make_word, engine_handler, serve, use_mongomock
+from search_batch import make_documents
+
+
+def make_data(words: int, queries: int, seed: int) -> Tuple[List[Dict], List[str], List[str]]:
+    rng = random.Random(seed)
+    documents: List[Dict] = make_documents(500, 200, 2000, seed)
+    vocabulary: List[str] = sorted({make_word(rng) for _ in range(words)} | {w for d in documents for w in d['words']})
+    # the trailing letter sends every query through the spelling correction
+    texts: List[str] = [' '.join(rng.sample(rng.choice(documents)['words'], 2)) + 'x' for _ in range(queries)]
+    return documents, vocabulary, texts
+
+
+def run_phase(phase: str, directory: Path, options: Dict, env: Optional[Dict[str, str]] = None) -> Dict:
+    completed = subprocess.run([sys.executable, str(Path(__file__).resolve()), phase, json.dumps(options)],
+                               cwd=directory, env={**os.environ, **(env or {})},
+                               stdout=subprocess.PIPE, check=True)
+    return json.loads(completed.stdout.decode().strip().splitlines()[-1])
+
+
+def web_phase(options: Dict) -> Dict:
+    sys.path.insert(0, str(ROOT / 'web'))
+    if not options['mongo']:
+        use_mongomock()
+
+    import asyncio
+    start: float = time.perf_counter()
+    import app as web
+    imported: float = time.perf_counter() - start
+
+    _, words, texts = make_data(options['words'], options['queries'], options['seed'])
+
+    async def measure() -> Dict:
+        from db import get_database
+        await get_database().WordsStorage.insert_many([{'word': word} for word in words])
+
+        start_up: float = time.perf_counter()
+        async with web.app.test_app() as test_app:
+            client = test_app.test_client()
+            while (await client.get('/health')).status_code != 200:
+                await asyncio.sleep(0.01)
+            ready: float = time.perf_counter() - start_up
+
+            latencies: List[float] = []
+            for text in texts:
+                query_start: float = time.perf_counter()
+                response = await client.post('/', form={'request': text})
+                await response.get_data()
+                latencies.append(time.perf_counter() - query_start)
+        return {'import_s': imported, 'ready_s': ready, 'first_query_ms': 1e3 * latencies[0],
+                'next_query_ms': 1e3 * sum(latencies[1:]) / max(1, len(latencies) - 1),
+                'time_to_first_query_s': imported + ready + latencies[0]}
+
+    return asyncio.run(measure())
+
+
+def scraper_phase(options: Dict) -> Dict:
+    sys.path.insert(0, str(ROOT / 'scraper'))
+    start: float = time.perf_counter()
+    import scraper
+    return {'import_s': time.perf_counter() - start, 'nltk_loaded': 'nltk' in sys.modules,
+            'bs4_loaded': 'bs4' in sys.modules}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Web app time to first query with and without warm-up")
+    parser.add_argument('--mongo', help='MongoDB URI, in-process mongomock by default')
+    parser.add_argument('--database', default='IRBench')
+    parser.add_argument('--words', type=int, default=20000, help='Spelling index size')
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    documents, _, _ = make_data(args.words, args.queries, args.seed)
+    server = serve(engine_handler(documents))
+    env: Dict[str, str] = {'SECRET': 'bench', 'ENGINE_URL': f"http://127.0.0.1:{server.server_address[1]}",
+                           'MONGO_DATABASE': args.database}
+    if args.mongo:
+        env['MONGO_URI'] = args.mongo
+
+    for warm_up in ('false', 'true'):
+        result: Dict = run_phase('web', ROOT / 'web', {
+            'mongo': args.mongo, 'words': args.words, 'queries': args.queries, 'seed': args.seed,
+        }, {**env, 'WARM_UP': warm_up})
+        print(f"web, warm-up {warm_up:>5}: import {result['import_s']:5.2f} s, ready {result['ready_s']:5.2f} s, "
+              f"first query {result['first_query_ms']:7.1f} ms, next queries {result['next_query_ms']:6.1f} ms, "
+              f"time to first query {result['time_to_first_query_s']:5.2f} s")
+
+    result = run_phase('scraper', ROOT / 'scraper', {})
+    print(f"scraper: import {result['import_s']:5.2f} s, in the crawl process NLTK loaded: {result['nltk_loaded']}, "
+          f"bs4 loaded: {result['bs4_loaded']}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] in ('web', 'scraper'):
+        phase = web_phase if sys.argv[1] == 'web' else scraper_phase
+        print(json.dumps(phase(json.loads(sys.argv[2]))))
+    else:
+        main()
@@ -0,0 +1,76 @@
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import List, Optional, Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'web'))
+
+from search_helper import BigramIndex, SpellingIndex, DeleteIndex
+from spelling_index import make_vocabulary, make_typo, report
+
+logger = logging.getLogger(__name__)
+
+
+def bench(index: SpellingIndex, queries: List[str], delete_index: Optional[DeleteIndex] = None) -> List[float]:
+    latencies: List[float] = []
+    for word in queries:
+        start = time.perf_counter()
+        BigramIndex([word], index, delete_index=delete_index).build(logger)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Spelling correction: n-gram candidates vs symmetric delete index")
+    parser.add_argument('--words', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--distance', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary: List[str] = make_vocabulary(args.words, rng)
+    queries: List[str] = [make_typo(rng.choice(vocabulary), rng) for _ in range(args.queries)]
+    known: Set[str] = set(vocabulary)
+    queries = [word for word in queries if word and word not in known]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = SpellingIndex()
+    index.add_many(vocabulary)
+    index.get_snapshot()
+    print(f"n-gram index: built in {time.perf_counter() - start:.2f} s, "
+          f"{tracemalloc.get_traced_memory()[0] / 2 ** 20:.1f} MiB traced")
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    built = DeleteIndex.build(vocabulary, args.distance)
+    print(f"delete index: built in {time.perf_counter() - start:.2f} s, {len(built.keys)} keys, "
+          f"{built.nbytes / 2 ** 20:.1f} MiB of arrays")
+    with tempfile.TemporaryDirectory() as path:
+        built.save(path)
+        start = time.perf_counter()
+        delete_index = DeleteIndex.load(path)
+        print(f"delete index: memory-mapped in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        report("n-gram path", bench(index, queries))
+        report("delete index path", bench(index, queries, delete_index))
+
+        same: int = 0
+        for word in queries:
+            ngram = BigramIndex([word], index)
+            ngram.build(logger)
+            deletes = BigramIndex([word], index, delete_index=delete_index)
+            deletes.build(logger)
+            same += ngram.get_supposed(word)[:1] == deletes.get_supposed(word)[:1]
+        print(f"same top correction for {same} of {len(queries)} queries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, label: Optional[str] = None, registry: Registry = REGISTRY):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label: Optional[str] = label
+        self.values: Dict[str, float] = {} if label else {'': 0}
+        registry.register(self)
+
+    def inc(self, value: float = 1, label_value: str = '') -> None:
+        self.values[label_value] = self.values.get(label_value, 0) + value
+
+    def samples(self) -> Iterator[str]:
+        for label_value, value in self.values.items():
+            if self.label:
+                yield f'{self.name}{{{self.label}="{escape(label_value)}"}} {value}'
+            else:
+                yield f'{self.name} {value}'
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, function: Callable[[], float],
+                 kind: str = 'gauge', registry: Registry = REGISTRY):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.function: Callable[[], float] = function
+        self.kind: str = kind
+        registry.register(self)
+
+    def samples(self) -> Iterator[str]:
+        yield f'{self.name} {self.function()}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Registry = REGISTRY):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.buckets: Sequence[float] = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum: float = 0
+        registry.register(self)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self) -> Iterator[str]:
+        cumulative: int = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{bound}"}} {cumulative}'
+        cumulative += self.counts[-1]
+        yield f'{self.name}_bucket{{le="+Inf"}} {cumulative}'
+        yield f'{self.name}_sum {self.sum}'
+        yield f'{self.name}_count {cumulative}'
+
+
+async def serve_metrics(host: str, port: int, registry: Registry = REGISTRY) -> asyncio.AbstractServer:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while (await reader.readline()).strip():
+                pass
+            body: bytes = registry.render().encode()
+            writer.write(b"HTTP/1.1 200 OK\r\n"
+                         + f"Content-Type: {CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\n".encode()
+                         + b"Connection: close\r\n\r\n" + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
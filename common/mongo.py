@@ -0,0 +1,48 @@
+from logging import Logger
+from typing import Callable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import WriteConcern
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+
+class Database:
+    # One lazily opened Motor client per process. Settings come from the app: anything with the
+    # mongo_* fields, default_settings() is used until configure() is called.
+    def __init__(self, default_settings: Callable, indexes: List[Tuple[str, str, bool]]) -> None:
+        self.default_settings: Callable = default_settings
+        self.indexes: List[Tuple[str, str, bool]] = indexes
+        self.settings = None
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.database: Optional[AsyncIOMotorDatabase] = None
+
+    def configure(self, settings) -> None:
+        self.close()
+        self.settings = settings
+
+    def get(self) -> AsyncIOMotorDatabase:
+        if self.settings is None:
+            self.settings = self.default_settings()
+        if self.database is None:
+            write_concern: str = self.settings.mongo_write_concern
+            self.client = AsyncIOMotorClient(self.settings.mongo_uri, maxPoolSize=self.settings.mongo_pool_size)
+            self.database = self.client.get_database(
+                self.settings.mongo_database,
+                write_concern=WriteConcern(w=int(write_concern) if write_concern.isdigit() else write_concern),
+                read_preference=make_read_preference(read_pref_mode_from_name(self.settings.mongo_read_preference),
+                                                     None),
+            )
+        return self.database
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client, self.database = None, None
+
+    async def ensure_indexes(self, logger: Logger) -> None:
+        for collection, field, unique in self.indexes:
+            try:
+                await self.get()[collection].create_index(field, unique=unique)
+            except OperationFailure as e:
+                logger.error("[%s] : Can't create index on %s, %s", collection, field, e)
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from collections import Counter
+from types import FrameType
+from typing import List, Optional, Tuple
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def frame_stack(frame: Optional[FrameType]) -> List[str]:
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def task_stack(task: asyncio.Task) -> List[str]:
+    # Await chain of a suspended task, outermost coroutine first
+    labels: List[str] = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame: Optional[FrameType] = getattr(awaitable, 'cr_frame', None) or getattr(awaitable, 'gi_frame', None)
+        if frame is None:
+            break
+        labels.append(frame_label(frame))
+        awaitable = getattr(awaitable, 'cr_await', None) or getattr(awaitable, 'gi_yieldfrom', None)
+    return labels
+
+
+class SamplingProfiler:
+    # Wall-clock sampler: a daemon thread records the stack of the profiled thread every interval
+    # and, when a loop is given, the await chains of its suspended tasks, so time spent waiting on
+    # the network shows up too. Stacks are kept in the collapsed format of flame graph tools.
+    # Nothing runs while the profiler is stopped.
+    def __init__(self, rate: float = 100, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 thread_id: Optional[int] = None) -> None:
+        self.interval: float = 1 / rate
+        self.loop: Optional[asyncio.AbstractEventLoop] = loop
+        self.thread_id: int = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples: int = 0
+        self.elapsed: float = 0
+        self.started: float = 0
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        self.stopping.clear()
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+        self.elapsed += time.monotonic() - self.started
+
+    def _run(self) -> None:
+        while not self.stopping.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        frame: Optional[FrameType] = sys._current_frames().get(self.thread_id)
+        if frame is not None:
+            self.stacks[';'.join(['run'] + frame_stack(frame))] += 1
+        if self.loop is not None:
+            try:
+                tasks: List[asyncio.Task] = list(asyncio.all_tasks(self.loop))
+            except RuntimeError:
+                tasks = []
+            for task in tasks:
+                # the running task is already in the thread stack
+                if getattr(task.get_coro(), 'cr_running', False):
+                    continue
+                stack: List[str] = task_stack(task)
+                if stack:
+                    self.stacks[';'.join(['await'] + stack)] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def hottest(self, count: int) -> List[Tuple[str, int]]:
+        return self.stacks.most_common(count)
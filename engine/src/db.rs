@@ -9,7 +9,26 @@ pub struct Doc {
     pub _id: ObjectId,
     pub title: String,
     pub path: String,
+    #[serde(default)]
     pub words: Vec<String>,
+    #[serde(default)]
+    pub terms: Vec<String>,
+    #[serde(default)]
+    pub counts: Vec<i64>,
+}
+
+impl Doc {
+    pub fn from_document(document: bson::Document) -> Result<Doc, bson::de::Error> {
+        let mut doc: Doc = bson::from_document(document)?;
+        if doc.words.is_empty() {
+            for (term, count) in doc.terms.iter().zip(doc.counts.iter()) {
+                for _ in 0..*count {
+                    doc.words.push(term.clone());
+                }
+            }
+        }
+        Ok(doc)
+    }
 }
 
 #[derive(Debug, Serialize, Deserialize)]
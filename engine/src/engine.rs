@@ -11,6 +11,7 @@ use crate::index;
 use crate::inverted_index;
 
 pub struct Engine {
+    pub generation: u64,
     top_n: u64,
     forward_index: index::Index,
     inverted_index: inverted_index::InvertedIndex,
@@ -31,7 +32,13 @@ pub async fn init_engine() -> Result<Engine, Box<dyn std::error::Error>> {
         inverted_index.build().await?;
     }
 
+    let generation = std::fs::metadata(inverted_index.index_content_file)?
+        .modified()?
+        .duration_since(std::time::UNIX_EPOCH)?
+        .as_millis() as u64;
+
     Ok(Engine {
+        generation,
         top_n: 20,
         forward_index,
         inverted_index,
@@ -6,8 +6,6 @@ use tokio::io::{AsyncReadExt, AsyncWriteExt, BufReader, BufWriter, ErrorKind};
 
 use futures::stream::StreamExt;
 
-use mongodb::bson;
-
 use crate::db;
 
 pub struct Index {
@@ -76,7 +74,7 @@ impl Index {
 
         while let Some(result) = cur.next().await {
             let mut tf = HashMap::new();
-            let doc: db::Doc = bson::from_document(result?)?;
+            let doc: db::Doc = db::Doc::from_document(result?)?;
             let mut words_count: u64 = 0;
             for word in &doc.words {
                 tf.entry(word)
@@ -9,7 +9,7 @@ use tokio::io::{
 use futures::future::join_all;
 use futures::stream::StreamExt;
 
-use mongodb::bson::{self, oid::ObjectId};
+use mongodb::bson::oid::ObjectId;
 
 use crate::db;
 
@@ -92,7 +92,7 @@ impl InvertedIndex {
         let mut tasks = Vec::new();
 
         while let Some(result) = cur.next().await {
-            let doc: db::Doc = bson::from_document(result?)?;
+            let doc: db::Doc = db::Doc::from_document(result?)?;
             let mut used = HashSet::new();
             for word in doc.words {
                 used.insert(word.to_owned());
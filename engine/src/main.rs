@@ -11,7 +11,7 @@ pub mod engine;
 pub mod index;
 pub mod inverted_index;
 
-use actix_web::{post, App, HttpResponse, HttpServer, Responder};
+use actix_web::{get, post, App, HttpResponse, HttpServer, Responder};
 use serde::{Deserialize, Serialize};
 use std::sync::Mutex;
 
@@ -23,13 +23,32 @@ struct Request {
 #[derive(Debug, Serialize, Deserialize)]
 struct Response {
     doc_ids: Vec<[u8; 12]>,
+    generation: u64,
+}
+
+#[derive(Debug, Serialize, Deserialize)]
+struct BatchRequest {
+    queries: Vec<Vec<String>>,
+}
+
+#[derive(Debug, Serialize, Deserialize)]
+struct BatchResponse {
+    doc_ids: Vec<Vec<[u8; 12]>>,
+    generation: u64,
+}
+
+#[derive(Debug, Serialize, Deserialize)]
+struct Generation {
+    generation: u64,
 }
 
 #[post("/search")]
 async fn search(req_body: String) -> impl Responder {
     println!("Request: {req_body}");
     let data: Request = serde_json::from_str(&req_body).unwrap();
-    let mut result = ENGINE.lock().unwrap().as_mut().unwrap().search(data.words).await.unwrap();
+    let mut guard = ENGINE.lock().unwrap();
+    let engine = guard.as_mut().unwrap();
+    let mut result = engine.search(data.words).await.unwrap();
     result.dedup();
 
     print!("Found doc_ids:\n");
@@ -39,6 +58,45 @@ async fn search(req_body: String) -> impl Responder {
 
     let response = Response {
         doc_ids: result.iter().map(|oid| oid.bytes()).collect(),
+        generation: engine.generation,
+    };
+
+    return HttpResponse::Ok().body(serde_json::to_string(&response).unwrap());
+}
+
+#[post("/search_batch")]
+async fn search_batch(req_body: String) -> impl Responder {
+    let data: BatchRequest = match serde_json::from_str(&req_body) {
+        Ok(data) => data,
+        Err(e) => return HttpResponse::BadRequest().body(e.to_string()),
+    };
+    print!("Batch request: {} queries\n", data.queries.len());
+
+    // One lock for the whole batch: queries are answered against the same index generation
+    let mut guard = ENGINE.lock().unwrap();
+    let engine = guard.as_mut().unwrap();
+    let mut doc_ids = Vec::with_capacity(data.queries.len());
+    for words in data.queries {
+        let mut result = match engine.search(words).await {
+            Ok(result) => result,
+            Err(e) => return HttpResponse::InternalServerError().body(e.to_string()),
+        };
+        result.dedup();
+        doc_ids.push(result.iter().map(|oid| oid.bytes()).collect());
+    }
+
+    let response = BatchResponse {
+        doc_ids,
+        generation: engine.generation,
+    };
+
+    return HttpResponse::Ok().body(serde_json::to_string(&response).unwrap());
+}
+
+#[get("/generation")]
+async fn generation() -> impl Responder {
+    let response = Generation {
+        generation: ENGINE.lock().unwrap().as_ref().unwrap().generation,
     };
 
     return HttpResponse::Ok().body(serde_json::to_string(&response).unwrap());
@@ -47,8 +105,13 @@ async fn search(req_body: String) -> impl Responder {
 #[tokio::main]
 async fn main() -> std::io::Result<()> {
     *ENGINE.lock().unwrap() = Some(engine::init_engine().await.unwrap());
-    HttpServer::new(|| App::new().service(search))
-        .bind(("localhost", 8080))?
-        .run()
-        .await
+    HttpServer::new(|| {
+        App::new()
+            .service(search)
+            .service(search_batch)
+            .service(generation)
+    })
+    .bind(("localhost", 8080))?
+    .run()
+    .await
 }
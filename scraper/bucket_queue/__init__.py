@@ -1 +1,3 @@
 from bucket_queue.queue import BucketQueue
+from bucket_queue.bloom import BloomFilter
+from bucket_queue.shards import ShardSpool, shard_of
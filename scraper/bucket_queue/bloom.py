@@ -0,0 +1,67 @@
+import math
+import mmap
+import os
+
+from hashlib import blake2b
+from typing import Iterator, Optional
+
+
+class BloomFilter:
+    header_size: int = 8
+
+    def __init__(self, capacity: int, error_rate: float, path: Optional[str] = None) -> None:
+        self.size: int = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes: int = max(1, round(self.size / capacity * math.log(2)))
+        self.nbytes: int = self.header_size + (self.size + 7) // 8
+        self.path = path
+
+        if path is None:
+            self.bits = bytearray(self.nbytes)
+        else:
+            exists: bool = os.path.exists(path)
+            if exists and os.path.getsize(path) != self.nbytes:
+                raise ValueError(f"Bloom filter {path} was built for another capacity or error rate")
+            with open(path, 'ab') as f:
+                f.truncate(self.nbytes)
+            self.file = open(path, 'r+b')
+            self.bits = mmap.mmap(self.file.fileno(), self.nbytes)
+        self.count: int = int.from_bytes(self.bits[:self.header_size], 'little')
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest: bytes = blake2b(item.encode(), digest_size=16).digest()
+        h1: int = int.from_bytes(digest[:8], 'little')
+        h2: int = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        offset: int = self.header_size
+        return all(bits[offset + (p >> 3)] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        bits = self.bits
+        offset: int = self.header_size
+        added: bool = False
+        for p in self._positions(item):
+            mask: int = 1 << (p & 7)
+            if not bits[offset + (p >> 3)] & mask:
+                bits[offset + (p >> 3)] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def flush(self) -> None:
+        self.bits[:self.header_size] = self.count.to_bytes(self.header_size, 'little')
+        if self.path is not None:
+            self.bits.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self.path is not None:
+            self.bits.close()
+            self.file.close()
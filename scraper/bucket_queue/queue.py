@@ -1,39 +1,93 @@
+import json
+import os
+
 from collections import deque
-from typing import List
+from typing import Iterable, List
 
 from utils import Settings
 
 
-class BucketQueue(deque):
-    def __init__(self, settings: Settings, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+class BucketQueue:
+    def __init__(self, settings: Settings, path: str):
         self.settings = settings
-        self.task = None
-        self.max_bucket_deque_size = 1e6
+        self.max_bucket_deque_size = settings.frontier_buffer_size
+        self.log_path: str = os.path.join(path, 'frontier.log')
+        self.checkpoint_path: str = os.path.join(path, 'frontier.checkpoint')
+
+        self._trim_log()
+        self.writer = open(self.log_path, 'ab')
+        self.reader = open(self.log_path, 'rb')
+        self.buffer: deque = deque()
+
+        self.consumed_offset: int = 0
+        resumed: List[str] = []
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            self.consumed_offset = checkpoint['offset']
+            resumed = checkpoint['in_flight']
+        self.read_offset: int = self.consumed_offset
+        self.buffer.extend((url, self.consumed_offset) for url in resumed)
+
+        self.reader.seek(self.read_offset)
+        self.unread: int = sum(1 for _ in self.reader)
+
+    def _trim_log(self) -> None:
+        # A crash in the middle of extend() leaves a partial last line, cut the log back to the last full one
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'r+b') as f:
+            size: int = f.seek(0, os.SEEK_END)
+            end: int = size
+            while end > 0:
+                start: int = max(0, end - 4096)
+                f.seek(start)
+                newline: int = f.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < size:
+                f.truncate(end)
 
-    def set_task(self, task) -> None:
-        self.task = task
+    def __len__(self) -> int:
+        return len(self.buffer) + self.unread
 
-    def extend(self, *args, **kwargs) -> None:
-        if super(BucketQueue, self).__len__() > self.max_bucket_deque_size:
-            return None
-        return super().extend(*args, **kwargs)
+    def __bool__(self) -> bool:
+        return len(self) > 0
 
-    def __iter__(self):
-        return self
+    def extend(self, urls: Iterable[str]) -> None:
+        lines: List[bytes] = [url.encode() + b'\n' for url in urls]
+        self.writer.writelines(lines)
+        self.writer.flush()
+        self.unread += len(lines)
 
-    def __next__(self) -> List:
-        if self.task is None:
-            raise Exception("Task of BucketQueue is None")
+    def _refill(self) -> None:
+        self.reader.seek(self.read_offset)
+        while self.unread and len(self.buffer) < self.max_bucket_deque_size:
+            line: bytes = self.reader.readline()
+            if not line.endswith(b'\n'):
+                break
+            self.read_offset += len(line)
+            self.unread -= 1
+            self.buffer.append((line[:-1].decode(), self.read_offset))
 
-        base_deque = super(BucketQueue, self)
-        bucket: List = []
-        processed_in_batch: int = 0
-        bound: int = min(base_deque.__len__(), self.settings.batch_size)
+    def popleft(self) -> str:
+        if not self.buffer:
+            self._refill()
+        url, offset = self.buffer.popleft()
+        self.consumed_offset = max(self.consumed_offset, offset)
+        return url
 
-        while processed_in_batch < bound:
-            url = self.popleft()
-            bucket.append(self.task(url))
-            processed_in_batch += 1
+    def checkpoint(self, in_flight: Iterable[str]) -> None:
+        os.fsync(self.writer.fileno())
+        tmp_path: str = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'offset': self.consumed_offset, 'in_flight': sorted(in_flight)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
 
-        return bucket
+    def close(self) -> None:
+        self.writer.close()
+        self.reader.close()
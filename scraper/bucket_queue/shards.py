@@ -0,0 +1,85 @@
+import json
+import os
+import time
+
+from hashlib import blake2b
+from itertools import count
+from typing import Dict, Iterable, List, Tuple
+
+
+def shard_of(url: str, shards: int) -> int:
+    return int.from_bytes(blake2b(url.encode(), digest_size=8).digest(), 'little') % shards
+
+
+class ShardSpool:
+    # Directory based mailbox between shard processes: every forwarded batch is one file,
+    # renamed into the owner's inbox once complete and deleted by the owner after it is queued.
+    def __init__(self, path: str, shards: int, shard_id: int):
+        self.shards: int = shards
+        self.shard_id: int = shard_id
+        self.inboxes: List[str] = [os.path.join(path, 'inbox', str(shard)) for shard in range(shards)]
+        self.status_path: str = os.path.join(path, 'status')
+        for directory in self.inboxes + [self.status_path]:
+            os.makedirs(directory, exist_ok=True)
+
+        self.sequence = count()
+        self.sent: int = 0
+        self.received: int = 0
+        status: Dict = self._read_status(shard_id)
+        self.sent, self.received = status.get('sent', 0), status.get('received', 0)
+
+    def split(self, urls: Iterable[str]) -> Tuple[List[str], Dict[int, List[str]]]:
+        owned: List[str] = []
+        foreign: Dict[int, List[str]] = {}
+        for url in urls:
+            shard: int = shard_of(url, self.shards)
+            if shard == self.shard_id:
+                owned.append(url)
+            else:
+                foreign.setdefault(shard, []).append(url)
+        return owned, foreign
+
+    def send(self, foreign: Dict[int, List[str]]) -> None:
+        for shard, urls in foreign.items():
+            name: str = f"{self.shard_id}-{os.getpid()}-{next(self.sequence)}"
+            tmp_path: str = os.path.join(self.inboxes[shard], name + '.tmp')
+            with open(tmp_path, 'w') as f:
+                f.write('\n'.join(urls))
+            os.replace(tmp_path, os.path.join(self.inboxes[shard], name + '.urls'))
+            self.sent += 1
+
+    def receive(self) -> Tuple[List[str], List[str]]:
+        inbox: str = self.inboxes[self.shard_id]
+        paths: List[str] = sorted(os.path.join(inbox, name) for name in os.listdir(inbox) if name.endswith('.urls'))
+        urls: List[str] = []
+        for path in paths:
+            with open(path) as f:
+                urls.extend(line for line in f.read().split('\n') if line)
+        return urls, paths
+
+    def acknowledge(self, paths: List[str]) -> None:
+        for path in paths:
+            os.remove(path)
+        self.received += len(paths)
+
+    def _read_status(self, shard: int) -> Dict:
+        try:
+            with open(os.path.join(self.status_path, f"{shard}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def publish(self, idle: bool) -> None:
+        tmp_path: str = os.path.join(self.status_path, f"{self.shard_id}.json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'idle': idle, 'sent': self.sent, 'received': self.received, 'updated': time.time()}, f)
+        os.replace(tmp_path, os.path.join(self.status_path, f"{self.shard_id}.json"))
+
+    def snapshot(self) -> List[Dict]:
+        return [self._read_status(shard) for shard in range(self.shards)]
+
+    @staticmethod
+    def is_quiescent(snapshot: List[Dict], since: float) -> bool:
+        # every shard of this run is idle and every forwarded batch has been taken in by its owner
+        return (all(status.get('idle') and status['updated'] >= since for status in snapshot)
+                and sum(status['sent'] for status in snapshot) == sum(status['received'] for status in snapshot))
@@ -1,4 +1,9 @@
-from db.save_documents import save_documents
+from db.client import configure_database, get_database, close_database, ensure_indexes
+from db.save_documents import save_documents, count_documents
+from db.doc_format import (encode_document, get_term_counts, get_words, iterate_documents,
+                           encode_fingerprint, decode_fingerprint)
 from db.save_words import save_words
-from db.save_bigrams import save_bigrams
-from db.url import load_visited_urls, dump_visited_urls, load_pending_urls, dump_pending_urls
+from db.save_bigrams import add_bigrams, rebuild_bigrams
+from db.url import (iterate_visited_urls, dump_visited_urls, iterate_pending_urls,
+                    get_validators, iterate_validators, dump_validators)
+from db.duplicates import iterate_fingerprints, dump_duplicates
@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+from typing import List
+from logging import Logger
+
+from pymongo import UpdateOne
+
+
+async def bulk_upsert(collection, requests: List[UpdateOne], logger: Logger,
+                      chunk_size: int = 1000, concurrency: int = 4) -> List[int]:
+    if not requests:
+        return []
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def write(chunk: List[UpdateOne]):
+        async with semaphore:
+            return await collection.bulk_write(chunk, ordered=False)
+
+    start: float = time.monotonic()
+    results = await asyncio.gather(
+        *(write(requests[i:i + chunk_size]) for i in range(0, len(requests), chunk_size))
+    )
+    elapsed: float = time.monotonic() - start
+
+    upserted: List[int] = sorted(
+        offset + index
+        for offset, result in zip(range(0, len(requests), chunk_size), results)
+        for index in result.upserted_ids
+    )
+    logger.info("[%s] : Wrote %s docs (%s new) in %.2f sec, %.1f docs/sec",
+                collection.name, len(requests), len(upserted), elapsed, len(requests) / elapsed if elapsed else 0)
+    return upserted
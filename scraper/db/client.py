@@ -0,0 +1,20 @@
+from typing import List, Tuple
+
+from utils import Settings
+from common.mongo import Database
+
+INDEXES: List[Tuple[str, str, bool]] = [
+    ('WordsStorage', 'word', True),
+    ('BigramStorage', 'bigram', True),
+    ('VisitedURLStorage', 'url', True),
+    ('PendingURLStorage', 'url', True),
+    ('DocsStorage', 'path', False),
+    ('DuplicateStorage', 'path', True),
+]
+
+database = Database(Settings, INDEXES)
+
+configure_database = database.configure
+get_database = database.get
+close_database = database.close
+ensure_indexes = database.ensure_indexes
@@ -0,0 +1,101 @@
+from collections import Counter
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from bson.binary import Binary
+
+
+def encode_varints(values: List[int]) -> bytes:
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data: bytes) -> Iterator[int]:
+    value: int = 0
+    shift: int = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value, shift = 0, 0
+
+
+def encode_fingerprint(fingerprint: int) -> int:
+    # BSON integers are signed 64-bit
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def decode_fingerprint(value: int) -> int:
+    return value & ((1 << 64) - 1)
+
+
+def encode_document(title: str, path: str, words: List[str],
+                    docs_format: str = "words", positions: bool = False,
+                    fingerprint: Optional[int] = None) -> Dict:
+    if docs_format == "words":
+        document: Dict = {'title': title, 'path': path, 'words': words}
+        if fingerprint is not None:
+            document['fingerprint'] = encode_fingerprint(fingerprint)
+        return document
+
+    counts = Counter(words)
+    terms: List[str] = sorted(counts)
+    document = {
+        'title': title,
+        'path': path,
+        'length': len(words),
+        'terms': terms,
+        'counts': [counts[term] for term in terms],
+    }
+    if fingerprint is not None:
+        document['fingerprint'] = encode_fingerprint(fingerprint)
+    if positions:
+        occurrences: Dict[str, List[int]] = {term: [] for term in terms}
+        for i, word in enumerate(words):
+            occurrences[word].append(i)
+        deltas: List[int] = []
+        for term in terms:
+            previous: int = 0
+            for position in occurrences[term]:
+                deltas.append(position - previous)
+                previous = position
+        document['positions'] = Binary(encode_varints(deltas))
+    return document
+
+
+def get_term_counts(record: Dict) -> Dict[str, int]:
+    if 'words' in record:
+        return dict(Counter(record['words']))
+    return dict(zip(record['terms'], record['counts']))
+
+
+def get_words(record: Dict) -> List[str]:
+    if 'words' in record:
+        return record['words']
+    if 'positions' not in record:
+        return [term for term, count in zip(record['terms'], record['counts']) for _ in range(count)]
+
+    words: List[str] = [""] * record['length']
+    deltas: Iterator[int] = decode_varints(record['positions'])
+    for term, count in zip(record['terms'], record['counts']):
+        position: int = 0
+        for _ in range(count):
+            position += next(deltas)
+            words[position] = term
+    return words
+
+
+async def iterate_documents(storage, batch_size: int = 100) -> AsyncIterator[Dict]:
+    async for record in storage.find({}, batch_size=batch_size).sort('_id', 1):
+        yield {
+            '_id': record['_id'],
+            'title': record['title'],
+            'path': record['path'],
+            'term_counts': get_term_counts(record),
+        }
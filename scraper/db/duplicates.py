@@ -0,0 +1,31 @@
+from typing import AsyncIterator, Dict, List, Tuple
+from logging import Logger
+
+from pymongo import UpdateOne
+
+from db.bulk import bulk_upsert
+from db.client import get_database
+from db.doc_format import decode_fingerprint
+
+
+async def iterate_fingerprints(logger: Logger) -> AsyncIterator[Tuple[str, int]]:
+    count: int = 0
+    async for record in get_database().DocsStorage.find({'fingerprint': {'$exists': True}},
+                                                        {'path': 1, 'fingerprint': 1}):
+        count += 1
+        yield record['path'], decode_fingerprint(record['fingerprint'])
+    logger.info("[DocsStorage] : Loaded %s fingerprints", count)
+
+
+async def dump_duplicates(duplicates: Dict[str, str], logger: Logger,
+                          chunk_size: int = 1000, concurrency: int = 4) -> None:
+    requests: List[UpdateOne] = [
+        UpdateOne(
+            {'path': path},
+            {'$set': {'path': path, 'duplicate_of': original}},
+            upsert=True
+        )
+        for path, original in duplicates.items()
+    ]
+    await bulk_upsert(get_database().DuplicateStorage, requests, logger, chunk_size, concurrency)
+    logger.info("[DuplicateStorage] : Dumped %s duplicates", len(requests))
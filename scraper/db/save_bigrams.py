@@ -1,24 +1,60 @@
-import asyncio
+from typing import Dict, List, Set
+from logging import Logger
+from itertools import tee
 
-from typing import List
+from pymongo import UpdateOne
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from db.bulk import bulk_upsert
+from db.client import get_database
 
-client = AsyncIOMotorClient()
 
+def get_bigrams(word: str) -> List[str]:
+    lhs, rhs = tee(word)
+    next(rhs, None)
+    return [''.join(p) for p in list(zip(lhs, rhs))]
 
-async def save_bigrams() -> None:
-    async for record in client.IR.WordsStorage.find():
-        word: str = record['word']
-        bigrams: List[str] = record['bigrams']
 
-        await asyncio.gather(
-            *(
-                client.IR.BigramStorage.find_one_and_update(
-                    {'bigram': bigram},
-                    {'$push': {'words': word}},
-                    upsert=True
-                )
-                for bigram in bigrams
-            )
+async def add_bigrams(words: List[str], logger: Logger,
+                      chunk_size: int = 1000, concurrency: int = 4) -> None:
+    postings: Dict[str, Set[str]] = dict()
+    for word in words:
+        for bigram in get_bigrams(word):
+            postings.setdefault(bigram, set()).add(word)
+
+    requests: List[UpdateOne] = [
+        UpdateOne(
+            {'bigram': bigram},
+            {'$addToSet': {'words': {'$each': sorted(bigram_words)}}},
+            upsert=True
         )
+        for bigram, bigram_words in postings.items()
+    ]
+    await bulk_upsert(get_database().BigramStorage, requests, logger, chunk_size, concurrency)
+
+
+async def rebuild_bigrams(logger: Logger, streaming: bool = False, chunk_size: int = 1000) -> None:
+    rebuilt = get_database().BigramStorageRebuild
+    await rebuilt.drop()
+
+    if streaming:
+        postings: Dict[str, Set[str]] = dict()
+        async for record in get_database().WordsStorage.find({}, {'word': 1, 'bigrams': 1}):
+            for bigram in record['bigrams']:
+                postings.setdefault(bigram, set()).add(record['word'])
+
+        documents: List[Dict] = [{'bigram': bigram, 'words': sorted(words)} for bigram, words in postings.items()]
+        for i in range(0, len(documents), chunk_size):
+            await rebuilt.insert_many(documents[i:i + chunk_size], ordered=False)
+    else:
+        pipeline: List[Dict] = [
+            {'$unwind': '$bigrams'},
+            {'$group': {'_id': '$bigrams', 'words': {'$addToSet': '$word'}}},
+            {'$project': {'_id': 0, 'bigram': '$_id', 'words': 1}},
+            {'$out': rebuilt.name},
+        ]
+        await get_database().WordsStorage.aggregate(pipeline, allowDiskUse=True).to_list(None)
+
+    await rebuilt.create_index('bigram', unique=True)
+    count: int = await rebuilt.count_documents({})
+    await rebuilt.rename('BigramStorage', dropTarget=True)
+    logger.info("[BigramStorage] : Rebuilt %s bigrams", count)
@@ -1,35 +1,62 @@
 from httpx import Response
-from typing import Tuple, List
+from typing import Callable, Dict, Tuple, List, Iterator, Optional
 from logging import Logger
-from bs4 import BeautifulSoup
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
 
-client = AsyncIOMotorClient()
+from db.doc_format import encode_document
+from db.client import get_database
+
+
+async def write_documents(chunk: List[Dict], replace: bool) -> int:
+    if not replace:
+        return len((await get_database().DocsStorage.insert_many(chunk, ordered=False)).inserted_ids)
+    result = await get_database().DocsStorage.bulk_write(
+        [ReplaceOne({'path': document['path']}, document, upsert=True) for document in chunk],
+        ordered=False
+    )
+    return result.modified_count + result.upserted_count
 
 
 async def save_documents(enriched: List[List[str]],
+                         titles: List[str],
                          responses: Tuple[Response],
-                         logger: Logger) -> None:
+                         logger: Logger,
+                         docs_format: str = "words",
+                         positions: bool = False,
+                         chunk_size: int = 100,
+                         replace: bool = False,
+                         fingerprints: Optional[List[Optional[int]]] = None) -> int:
     if not responses:
-        return
-
-    titles: List[str] = []
-    for response in responses:
-        soup = BeautifulSoup(response.text, features="html.parser")
-        title = soup.find(id='firstHeading')
-        if title:
-            titles.append(title.get_text())
-
-    documents = await client.IR.DocsStorage.insert_many(
-        [
-            {
-                'title': title,
-                'path': response.url.path,
-                'words': words
-            }
-            for response, words, title in zip(responses, enriched, titles) if response
-        ]
+        return 0
+
+    documents: Iterator[Dict] = (
+        encode_document(title, response.url.path, words, docs_format, positions, fingerprint)
+        for response, words, title, fingerprint in zip(responses, enriched, titles,
+                                                       fingerprints or [None] * len(responses)) if response
     )
 
-    logger.info("Saved %s documents", len(documents.inserted_ids))
+    saved: int = 0
+    chunk: List[Dict] = []
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) >= chunk_size:
+            saved += await write_documents(chunk, replace)
+            chunk = []
+    if chunk:
+        saved += await write_documents(chunk, replace)
+
+    logger.info("Saved %s documents", saved)
+    return saved
+
+
+async def count_documents(logger: Logger, path_filter: Optional[Callable[[str], bool]] = None) -> int:
+    storage = get_database().DocsStorage
+    if path_filter is None:
+        count: int = await storage.count_documents({})
+    else:
+        count = 0
+        async for record in storage.find({}, {'path': 1}):
+            count += path_filter(record['path'])
+    logger.info("[DocsStorage] : %s documents stored", count)
+    return count
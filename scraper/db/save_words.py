@@ -1,28 +1,26 @@
-import asyncio
-
-from typing import List, Tuple
+from typing import List
 from logging import Logger
-from itertools import chain, tee
-
-from motor.motor_asyncio import AsyncIOMotorClient
+from itertools import chain
 
-client = AsyncIOMotorClient()
+from pymongo import UpdateOne
 
+from db.bulk import bulk_upsert
+from db.save_bigrams import add_bigrams, get_bigrams
+from db.client import get_database
 
-def get_bigrams(word: str) -> List[str]:
-    lhs, rhs = tee(word)
-    next(rhs, None)
-    return [''.join(p) for p in list(zip(lhs, rhs))]
 
-
-async def save_words(enriched: List[List[str]], logger: Logger) -> None:
-    insert_tasks = [
-        client.IR.WordsStorage.find_one_and_update(
+async def save_words(enriched: List[List[str]], logger: Logger,
+                     chunk_size: int = 1000, concurrency: int = 4) -> None:
+    words: List[str] = list(dict.fromkeys(chain.from_iterable(enriched)))
+    requests: List[UpdateOne] = [
+        UpdateOne(
             {'word': word},
-            {'$set': {'word': word, 'bigrams': get_bigrams(word)}},
+            {'$setOnInsert': {'word': word, 'bigrams': get_bigrams(word)}},
             upsert=True
         )
-        for word in chain.from_iterable(zip(*enriched))
+        for word in words
     ]
-    results: Tuple = await asyncio.gather(*insert_tasks)
-    logger.info("Inserted %s new words", len(results))
+    inserted: List[int] = await bulk_upsert(get_database().WordsStorage, requests, logger, chunk_size, concurrency)
+    logger.info("Inserted %s new words", len(inserted))
+
+    await add_bigrams([words[i] for i in inserted], logger, chunk_size, concurrency)
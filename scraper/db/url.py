@@ -1,49 +1,77 @@
-import asyncio
-
-from typing import Tuple, Set
+from typing import AsyncIterator, Dict, List, Set, Tuple
 from logging import Logger
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 
-client = AsyncIOMotorClient()
+from db.bulk import bulk_upsert
+from db.client import get_database
 
 
-async def load_urls(logger: Logger, storage) -> Set[str]:
-    urls: Set[str] = set()
-    try:
-        async for record in storage.find():
-            urls.add(record['url'])
-        logger.info("[%s] : Loaded %s URL", storage.name, len(urls))
-    except:
-        pass
-    return urls
+async def iterate_urls(logger: Logger, storage) -> AsyncIterator[str]:
+    count: int = 0
+    async for record in storage.find({}, {'url': 1}):
+        count += 1
+        yield record['url']
+    logger.info("[%s] : Loaded %s URL", storage.name, count)
 
 
-async def dump_urls(urls: Set[str], logger: Logger, storage) -> None:
-    insert_tasks = [
-        storage.find_one_and_update(
+async def dump_urls(urls: Set[str], logger: Logger, storage,
+                    chunk_size: int = 1000, concurrency: int = 4) -> None:
+    requests: List[UpdateOne] = [
+        UpdateOne(
             {'url': url},
             {'$set': {'url': url}},
             upsert=True
         )
         for url in urls
     ]
-    results: Tuple = await asyncio.gather(*insert_tasks)
-    logger.info("[%s] : Dumped %s URL", storage.name, len(results))
+    await bulk_upsert(storage, requests, logger, chunk_size, concurrency)
+    logger.info("[%s] : Dumped %s URL", storage.name, len(requests))
+
+
+def iterate_visited_urls(logger: Logger) -> AsyncIterator[str]:
+    return iterate_urls(logger, get_database().VisitedURLStorage)
+
+
+async def dump_visited_urls(urls: Set[str], logger: Logger,
+                            chunk_size: int = 1000, concurrency: int = 4) -> None:
+    return await dump_urls(urls, logger, get_database().VisitedURLStorage, chunk_size, concurrency)
 
 
-async def load_visited_urls(logger: Logger) -> Set[str]:
-    return await load_urls(logger, client.IR.VisitedURLStorage)
+def iterate_pending_urls(logger: Logger) -> AsyncIterator[str]:
+    return iterate_urls(logger, get_database().PendingURLStorage)
 
 
-async def dump_visited_urls(urls: Set[str], logger: Logger) -> None:
-    return await dump_urls(urls, logger, client.IR.VisitedURLStorage)
+def get_validators(headers) -> Dict[str, str]:
+    validators: Dict[str, str] = {}
+    if 'ETag' in headers:
+        validators['etag'] = headers['ETag']
+    if 'Last-Modified' in headers:
+        validators['last_modified'] = headers['Last-Modified']
+    return validators
 
 
-async def load_pending_urls(logger: Logger) -> Set[str]:
-    return await load_urls(logger, client.IR.PendingURLStorage)
+async def iterate_validators(logger: Logger) -> AsyncIterator[Tuple[str, Dict[str, str]]]:
+    count: int = 0
+    async for record in get_database().VisitedURLStorage.find({}, {'url': 1, 'etag': 1, 'last_modified': 1}):
+        count += 1
+        headers: Dict[str, str] = {}
+        if 'etag' in record:
+            headers['If-None-Match'] = record['etag']
+        if 'last_modified' in record:
+            headers['If-Modified-Since'] = record['last_modified']
+        yield record['url'], headers
+    logger.info("[VisitedURLStorage] : Loaded %s URL with validators", count)
 
 
-async def dump_pending_urls(urls: Set[str], logger: Logger) -> None:
-    await client.IR.PendingURLStorage.drop()
-    return await dump_urls(urls, logger, client.IR.PendingURLStorage)
+async def dump_validators(validators: Dict[str, Dict[str, str]], logger: Logger,
+                          chunk_size: int = 1000, concurrency: int = 4) -> None:
+    requests: List[UpdateOne] = [
+        UpdateOne(
+            {'url': url},
+            {'$set': {'url': url, **fields}},
+            upsert=True
+        )
+        for url, fields in validators.items() if fields
+    ]
+    await bulk_upsert(get_database().VisitedURLStorage, requests, logger, chunk_size, concurrency)
@@ -0,0 +1,2 @@
+from dedup.simhash import simhash, hamming_distance
+from dedup.lsh import NearDuplicateIndex
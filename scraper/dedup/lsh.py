@@ -0,0 +1,40 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from dedup.simhash import hamming_distance
+
+
+class NearDuplicateIndex:
+    # Fingerprints within `threshold` bits of each other agree on at least one of threshold + 1
+    # disjoint bit bands, so candidates are the fingerprints sharing a band value.
+    def __init__(self, threshold: int = 3) -> None:
+        self.threshold: int = threshold
+        count: int = threshold + 1
+        self.bands: List[Tuple[int, int]] = [(64 * i // count, (1 << (64 * (i + 1) // count - 64 * i // count)) - 1)
+                                             for i in range(count)]
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in self.bands]
+        self.fingerprints: List[int] = []
+        self.paths: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def _keys(self, fingerprint: int) -> Iterator[Tuple[Dict[int, List[int]], int]]:
+        for table, (shift, mask) in zip(self.tables, self.bands):
+            yield table, fingerprint >> shift & mask
+
+    def find(self, fingerprint: int, path: Optional[str] = None) -> Optional[str]:
+        # Closest earlier page within the threshold, other than the page itself
+        best: Optional[Tuple[int, str]] = None
+        for table, key in self._keys(fingerprint):
+            for i in table.get(key, ()):
+                distance: int = hamming_distance(fingerprint, self.fingerprints[i])
+                if distance <= self.threshold and self.paths[i] != path and (best is None or distance < best[0]):
+                    best = (distance, self.paths[i])
+        return best[1] if best is not None else None
+
+    def add(self, fingerprint: int, path: str) -> None:
+        entry: int = len(self.fingerprints)
+        self.fingerprints.append(fingerprint)
+        self.paths.append(path)
+        for table, key in self._keys(fingerprint):
+            table.setdefault(key, []).append(entry)
@@ -0,0 +1,31 @@
+from collections import Counter
+from hashlib import blake2b
+from typing import List, Optional
+
+
+def hamming_distance(lhs: int, rhs: int) -> int:
+    return bin(lhs ^ rhs).count('1')
+
+
+def simhash(words: List[str], shingle_size: int = 3) -> Optional[int]:
+    # 64-bit SimHash of the word shingles weighted by their counts. Shingle weights are summed
+    # per byte value of the hash first, so a shingle costs eight additions instead of 64.
+    if not words:
+        return None
+    size: int = min(shingle_size, len(words))
+    shingles: Counter = Counter(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+    tables: List[List[int]] = [[0] * 256 for _ in range(8)]
+    total: int = 0
+    for shingle, weight in shingles.items():
+        for table, byte in zip(tables, blake2b(shingle.encode(), digest_size=8).digest()):
+            table[byte] += weight
+        total += weight
+
+    fingerprint: int = 0
+    for k, table in enumerate(tables):
+        weighted: List[tuple] = [(byte, weight) for byte, weight in enumerate(table) if weight]
+        for bit in range(8):
+            if 2 * sum(weight for byte, weight in weighted if byte >> bit & 1) > total:
+                fingerprint |= 1 << (8 * k + bit)
+    return fingerprint
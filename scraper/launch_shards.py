@@ -0,0 +1,33 @@
+import subprocess
+import sys
+import time
+
+from typing import Dict, List, Optional
+
+from utils import ArgParser
+
+
+if __name__ == "__main__":
+    args: Dict = ArgParser().parse()
+    processes: List[subprocess.Popen] = [
+        subprocess.Popen([sys.executable, 'main.py', *sys.argv[1:], '--shard_id', str(shard)])
+        for shard in range(args['shards'])
+    ]
+
+    failed: Optional[int] = None
+    try:
+        while True:
+            # poll every shard, a dead one never publishes idle and the others would wait for it
+            codes: List[Optional[int]] = [process.poll() for process in processes]
+            failed = next((code for code in codes if code), None)
+            if failed is not None or all(code is not None for code in codes):
+                break
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+        process.wait()
+    sys.exit(failed or max(process.returncode for process in processes))
@@ -0,0 +1,2 @@
+from rate_control.controller import RateController, HostRateControl, parse_retry_after, backoff_delay
+from rate_control.fetch import fetch
@@ -0,0 +1,94 @@
+import asyncio
+import random
+import time
+
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from httpx import URL
+
+from utils import Settings
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RateController:
+    def __init__(self, rate: float, min_rate: float, max_rate: float,
+                 increase: float, decrease: float, latency_target: float):
+        self.rate: float = rate
+        self.min_rate: float = min_rate
+        self.max_rate: float = max_rate
+        self.increase: float = increase
+        self.decrease: float = decrease
+        self.latency_target: float = latency_target
+
+        self.next_slot: float = 0
+        self.blocked_until: float = 0
+        self.last_decrease: float = 0
+        self.throttled: int = 0
+
+    async def acquire(self) -> None:
+        while True:
+            now: float = time.monotonic()
+            slot: float = max(self.next_slot, self.blocked_until)
+            if slot <= now:
+                self.next_slot = now + 1 / self.rate
+                return
+            await asyncio.sleep(slot - now)
+
+    def on_success(self, latency: float) -> None:
+        if latency > self.latency_target:
+            self._decrease()
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttled(self, retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        self._decrease()
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def _decrease(self) -> None:
+        # responses to requests sent before the last cut must not cut the rate again
+        now: float = time.monotonic()
+        if now - self.last_decrease < max(1.0, self.latency_target):
+            return
+        self.last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+
+
+class HostRateControl:
+    def __init__(self, settings: Settings):
+        self.settings: Settings = settings
+        self.hosts: Dict[str, RateController] = {}
+
+    def get(self, url: URL) -> RateController:
+        controller: Optional[RateController] = self.hosts.get(url.host)
+        if controller is None:
+            controller = RateController(rate=self.settings.rps,
+                                        min_rate=self.settings.min_rps,
+                                        max_rate=self.settings.rps,
+                                        increase=self.settings.rps_increase,
+                                        decrease=self.settings.rps_decrease,
+                                        latency_target=self.settings.latency_target)
+            self.hosts[url.host] = controller
+        return controller
+
+    def stats(self) -> Dict[str, float]:
+        return {host: controller.rate for host, controller in self.hosts.items()}
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from logging import Logger
+from typing import Dict, Optional
+
+from httpx import AsyncClient, Response, URL, codes
+
+from utils import Settings, Counter
+from rate_control.controller import HostRateControl, RateController, parse_retry_after, backoff_delay
+
+RETRY_CODES = frozenset((codes.TOO_MANY_REQUESTS, codes.SERVICE_UNAVAILABLE))
+
+RETRIES = Counter('scraper_retries_total', 'Retried requests by cause', label='cause')
+REDIRECTS = Counter('scraper_redirects_total', 'Followed redirects')
+
+
+async def fetch(client: AsyncClient, url: str, hosts: HostRateControl,
+                settings: Settings, logger: Logger,
+                headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+    target: URL = URL(url)
+    retries: int = 0
+    redirects: int = 0
+
+    while True:
+        controller: RateController = hosts.get(target)
+        await controller.acquire()
+
+        start: float = time.monotonic()
+        response: Optional[Response] = None
+        try:
+            response = await client.get(target, headers=None if redirects else headers)
+        except Exception as e:
+            logger.warning("Request error on url: %s, %r", target, e)
+
+        if response is None or response.status_code in RETRY_CODES:
+            retry_after: Optional[float] = None
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                await response.aclose()
+            controller.on_throttled(retry_after)
+            RETRIES.inc(label_value='error' if response is None else str(response.status_code))
+
+            if retries >= settings.max_retries:
+                logger.error("Can't scrape url: %s, max retries was reached", url)
+                return None
+            logger.warning("Throttled on url: %s, retry: %s, host rate %.1f", target, retries, controller.rate)
+            await asyncio.sleep(backoff_delay(retries, settings.backoff_base, settings.backoff_cap))
+            retries += 1
+            continue
+
+        controller.on_success(time.monotonic() - start)
+
+        if response.has_redirect_location:
+            if redirects >= settings.max_redirects:
+                logger.error("Can't scrape url: %s, too many redirects", url)
+                return None
+            logger.warning("Redirect on url: %s", target)
+            target = target.join(response.headers['Location'])
+            redirects += 1
+            REDIRECTS.inc()
+            continue
+
+        if response.status_code not in (codes.OK, codes.NOT_MODIFIED):
+            logger.error("Response error on url: %s, code %s", target, response.status_code)
+            return None
+
+        return response
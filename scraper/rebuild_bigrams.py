@@ -0,0 +1,20 @@
+import argparse
+import asyncio
+import coloredlogs
+import logging
+
+from db import rebuild_bigrams
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild BigramStorage from WordsStorage")
+    parser.add_argument(
+        '--streaming',
+        help="Build postings in a single pass on the client instead of a server-side aggregation",
+        action="store_true"
+    )
+    args = parser.parse_args()
+
+    logger = logging.getLogger(__name__)
+    coloredlogs.install(level=logging.INFO)
+    asyncio.run(rebuild_bigrams(logger, streaming=args.streaming))
@@ -1,48 +1,129 @@
 import asyncio
 import coloredlogs
+import dataclasses
 import logging
+import os
+import signal
+import time
 
-from aiolimiter import AsyncLimiter
-from httpx import AsyncClient, Response, codes
-from bs4 import BeautifulSoup
+from httpx import AsyncClient, Limits, Response, codes
 from robots import RobotsParser
-from typing import Tuple, Set, List
-from functools import partial, wraps
+from typing import Dict, Tuple, Set, List, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from utils import Settings
-from bucket_queue import BucketQueue
-from db import save_documents, save_words, save_bigrams,\
-    load_visited_urls, dump_visited_urls, load_pending_urls, dump_pending_urls
-from text_enrich import enrich_text, get_text
+from utils import Settings, Counter, Histogram, SamplingProfiler, serve_metrics
+from bucket_queue import BucketQueue, BloomFilter, ShardSpool, shard_of
+from db import (save_documents, count_documents, save_words, iterate_visited_urls, dump_visited_urls, iterate_pending_urls,
+                get_validators, iterate_validators, dump_validators, iterate_fingerprints, dump_duplicates,
+                configure_database, close_database, ensure_indexes)
+from text_enrich import Page, parse_page, init_worker, check_worker
+from rate_control import HostRateControl, fetch
+from dedup import NearDuplicateIndex
+
+
+PAGES = Counter('scraper_pages_total', 'Pages by outcome', label='outcome')
+ERRORS = Counter('scraper_errors_total', 'Failed pages by stage', label='stage')
+STAGE_SECONDS: Dict[str, Histogram] = {
+    'fetch': Histogram('scraper_fetch_seconds', 'Fetch latency per page, retries included'),
+    'enrich': Histogram('scraper_enrich_seconds', 'Parse and enrichment time per page'),
+    'persist': Histogram('scraper_persist_seconds', 'Database write time per persisted batch'),
+}
 
 
 class Scraper:
     logger = logging.getLogger(__name__)
     
     def __init__(self, settings: Settings):
+        self.spool_path: str = os.path.join(settings.state_dir, 'spool')
+        if settings.shards > 1:
+            settings = dataclasses.replace(
+                settings,
+                state_dir=os.path.join(settings.state_dir, f'shard-{settings.shard_id}'),
+                max_scraped_count=(settings.max_scraped_count // settings.shards
+                                   + (settings.shard_id < settings.max_scraped_count % settings.shards)),
+                rps=max(1, settings.rps // settings.shards),
+                metrics_port=settings.metrics_port and settings.metrics_port + settings.shard_id,
+            )
         self.settings: Settings = settings
         Scraper.logger.setLevel(level=self.settings.log_level)
         coloredlogs.install(level=Scraper.logger.level)
+        configure_database(self.settings)
 
         self.robots = RobotsParser.from_uri(uri=f"{self.settings.url_base}/robots.txt")
         if self.settings.rps > 50:
             Scraper.logger.warning("Your rps(%s) too large", self.settings.rps)
-        self.throttler = AsyncLimiter(max_rate=self.settings.rps, time_period=1)
+        self.hosts = HostRateControl(self.settings)
+
+        self.in_flight: int = 0
+        self.scraped: int = 0
+        self.unchanged: int = 0
+        self.duplicates: int = 0
+        self.near_duplicates: Optional[NearDuplicateIndex] = None
+        if self.settings.dedup != 'off':
+            self.near_duplicates = NearDuplicateIndex(self.settings.dedup_threshold)
+        self.validators: Dict[str, Dict[str, str]] = {}
+        self.recrawl_queue: deque = deque()
+        self.in_progress: Set[str] = set()
+        self.spool: Optional[ShardSpool] = None
+        self.finished: bool = False
+        self.frontier_updated: Optional[asyncio.Event] = None
+        self.started: float = 0
+        self.profiler: Optional[SamplingProfiler] = None
+        self.profile_timer: Optional[asyncio.TimerHandle] = None
+        self.stages: Dict[str, List[float]] = {'fetch': [0, 0], 'enrich': [0, 0], 'persist': [0, 0]}
 
     async def _load_scraper_state(self):
-        loaded_visited_urls: Set[str] = await load_visited_urls(Scraper.logger)
-        if loaded_visited_urls:
-            self.visited = loaded_visited_urls
-        else:
-            self.visited = {self.settings.start_url}
-            await dump_visited_urls({self.settings.start_url}, Scraper.logger)
-
-        self.queue = BucketQueue(settings=self.settings)
-        loaded_pending_urls: Set[str] = await load_pending_urls(Scraper.logger)
-        if loaded_pending_urls:
-            self.queue.extend(loaded_pending_urls)
-        else:
-            self.queue.extend(self.visited)
+        os.makedirs(self.settings.state_dir, exist_ok=True)
+        bloom_path: str = os.path.join(self.settings.state_dir, 'visited.bloom')
+        is_new: bool = not os.path.exists(bloom_path)
+        self.visited = BloomFilter(capacity=self.settings.bloom_capacity,
+                                   error_rate=self.settings.bloom_error_rate,
+                                   path=bloom_path)
+        self.queue = BucketQueue(settings=self.settings, path=self.settings.state_dir)
+        if self.settings.shards > 1:
+            self.spool = ShardSpool(self.spool_path, self.settings.shards, self.settings.shard_id)
+            self.spool.publish(idle=False)
+
+        if not self.settings.recrawl:
+            # --docs_count limits the documents in the corpus, earlier runs included
+            self.scraped = await count_documents(
+                Scraper.logger,
+                None if self.spool is None else lambda path: self._owns(f'{self.settings.url_base}{path}'))
+
+        if is_new:
+            async for url in iterate_visited_urls(Scraper.logger):
+                self.visited.add(url)
+            pending: List[str] = []
+            async for url in iterate_pending_urls(Scraper.logger):
+                if self._owns(url) and self.visited.add(url):
+                    pending.append(url)
+            self.queue.extend(pending)
+            if not self.queue and self._owns(self.settings.start_url):
+                self.visited.add(self.settings.start_url)
+                self.queue.extend([self.settings.start_url])
+            self._checkpoint()
+
+        if self.settings.recrawl:
+            async for url, headers in iterate_validators(Scraper.logger):
+                self.validators[url] = headers
+                self.recrawl_queue.append(url)
+
+        if self.near_duplicates is not None:
+            async for path, fingerprint in iterate_fingerprints(Scraper.logger):
+                self.near_duplicates.add(fingerprint, path)
+
+        Scraper.logger.info("Crawl state: %s seen URL, %s scraped, %s pending URL, %s URL to recrawl",
+                            len(self.visited), self.scraped, len(self.queue), len(self.recrawl_queue))
+
+    def _owns(self, url: str) -> bool:
+        return self.spool is None or shard_of(url, self.settings.shards) == self.settings.shard_id
+
+    def _checkpoint(self) -> None:
+        if not self.settings.recrawl:
+            self.queue.checkpoint(self.in_progress)
+        self.visited.flush()
 
     def _filter_urls(self, urls: Set[str]) -> Set[str]:
         filtered: Set[str] = {f'{self.settings.url_base}{url}' for url in urls
@@ -53,78 +134,305 @@ class Scraper:
         Scraper.logger.info("Discarded %s refs from current batch of documents", len(urls) - len(filtered))
         return filtered
 
-    def _find_hrefs(self, sources: Tuple) -> Set[str]:
+    def _find_hrefs(self, pages: List[Page]) -> Set[str]:
         result: Set[str] = set()
-        for s in sources:
-            if not s:
-                continue
-            soup = BeautifulSoup(s.text, features="html.parser")
-            result |= {a['href'] for a in soup.find_all('a', href=True)}
+        for page in pages:
+            result.update(page.hrefs)
         Scraper.logger.info("Got %s refs from current batch of documents", len(result))
         return result
 
-    @staticmethod
-    def _handle_response(task):
-        @wraps(task)
-        async def wrapper(self, url: str, client: AsyncClient):
-            retries: int = 0
-            max_retires: int = 5
-            response: Response = await task(self, url, client)
-
-            while ((response.status_code == codes.TOO_MANY_REQUESTS or response.status_code == codes.SERVICE_UNAVAILABLE)
-                   and retries <= max_retires):
-                Scraper.logger.warning("Too many request for url: %s, retry: %s", url, retries)
-                await asyncio.sleep(1)
-                response = await task(self, url, url, client)
-                retries += 1
-
-            if retries > max_retires:
-                Scraper.logger.error("Can't scrape url: %s, max retries was reached", url)
-                return None
+    async def _scrape(self, url: str, client: AsyncClient) -> Optional[Response]:
+        return await fetch(client, url, self.hosts, self.settings, Scraper.logger, self.validators.get(url))
+
+    def _find_duplicates(self, batch: List[Tuple[str, Response, Page]]) -> Dict[str, str]:
+        # path of every near-duplicate page in the batch -> path of the stored original
+        duplicates: Dict[str, str] = {}
+        if self.near_duplicates is None:
+            return duplicates
+        for _, response, page in batch:
+            if page.fingerprint is None:
+                continue
+            path: str = response.url.path
+            original: Optional[str] = self.near_duplicates.find(page.fingerprint, path)
+            if original is not None:
+                duplicates[path] = original
+            else:
+                self.near_duplicates.add(page.fingerprint, path)
+        return duplicates
+
+    def _account(self, stage: str, pages: int, elapsed: float) -> None:
+        self.stages[stage][0] += pages
+        self.stages[stage][1] += elapsed
+        STAGE_SECONDS[stage].observe(elapsed)
 
-            if codes.is_redirect(response.status_code):
-                Scraper.logger.warning("Redirect on url: %s", url)
-                response = await task(self, response.headers['Location'], client)
+    def _log_stages(self) -> None:
+        wall: float = time.monotonic() - self.started
+        for stage, (pages, elapsed) in self.stages.items():
+            Scraper.logger.info("[%s] : %s pages, %.2f pages/sec, %.1f ms per page",
+                                stage, pages, pages / wall if wall else 0, 1e3 * elapsed / pages if pages else 0)
+        for host, rate in self.hosts.stats().items():
+            Scraper.logger.info("[%s] : %.1f rps", host, rate)
 
-            if response.status_code != codes.OK:
-                Scraper.logger.error("Response error on url: %s, code %s", url, response.status_code)
+    def _bulk_options(self) -> Tuple[int, int]:
+        return self.settings.bulk_chunk_size, self.settings.bulk_concurrency
+
+    def _release(self, url: str) -> None:
+        self.in_progress.discard(url)
+        self.in_flight -= 1
+        self.frontier_updated.set()
+
+    def _can_claim(self) -> bool:
+        queue = self.recrawl_queue if self.settings.recrawl else self.queue
+        return bool(queue) and self.scraped + self.in_flight < self.settings.max_scraped_count
+
+    async def _claim_url(self) -> Optional[str]:
+        queue = self.recrawl_queue if self.settings.recrawl else self.queue
+        while True:
+            while self._can_claim():
+                url: str = queue.popleft()
+                self.in_progress.add(url)
+                self.in_flight += 1
+                return url
+            if self.finished or (self.spool is None and not self.in_flight):
                 return None
+            self.frontier_updated.clear()
+            await self.frontier_updated.wait()
+
+    async def _fetch_stage(self, client: AsyncClient, pages: asyncio.Queue) -> None:
+        while True:
+            url: Optional[str] = await self._claim_url()
+            if url is None:
+                break
+
+            start: float = time.monotonic()
+            response: Optional[Response] = await self._scrape(url, client)
+            self._account('fetch', 1, time.monotonic() - start)
 
-            return response
+            if response is None:
+                ERRORS.inc(label_value='fetch')
+                self._release(url)
+                continue
+            if response.status_code == codes.NOT_MODIFIED:
+                PAGES.inc(label_value='unchanged')
+                self.unchanged += 1
+                self._release(url)
+                continue
+            PAGES.inc(label_value='fetched')
+            await pages.put((url, response))
 
-        return wrapper
+    async def _enrich_stage(self, pages: asyncio.Queue, parsed: asyncio.Queue, pool: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item: Optional[Tuple[str, Response]] = await pages.get()
+            if item is None:
+                break
+            url, response = item
 
-    @_handle_response
-    async def _scrape(self, url: str, client: AsyncClient) -> Response:
-        async with self.throttler:
+            start: float = time.monotonic()
             try:
-                return await client.get(url)
+                page: Page = await loop.run_in_executor(pool, parse_page, response.text, self.settings.html_parser,
+                                                        self.settings.dedup_shingle if self.near_duplicates is not None else 0)
             except Exception as e:
-                return None
+                Scraper.logger.error("Can't parse url: %s, %r", url, e)
+                ERRORS.inc(label_value='enrich')
+                self._release(url)
+                continue
+            self._account('enrich', 1, time.monotonic() - start)
 
-    async def run(self):
-        await self._load_scraper_state()
-        async with AsyncClient() as client:
-            task = partial(self._scrape, client=client)
-            self.queue.set_task(task)
-            for tasks in self.queue:
-                results: Tuple = await asyncio.gather(*tasks)
-
-                if len(self.visited) > self.settings.max_scraped_count:
+            await parsed.put((url, response, page))
+
+    async def _persist_stage(self, parsed: asyncio.Queue) -> None:
+        done: bool = False
+        while not done:
+            batch: List[Tuple[str, Response, Page]] = []
+            item: Optional[Tuple[str, Response, Page]] = await parsed.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.settings.batch_size or parsed.empty():
                     break
+                item = parsed.get_nowait()
+            done = item is None
+            if not batch:
+                continue
+
+            start: float = time.monotonic()
+            results: Tuple[Response] = tuple(response for _, response, _ in batch)
+            duplicates: Dict[str, str] = self._find_duplicates(batch)
+            stored: List[Tuple[str, Response, Page]] = [item for item in batch if item[1].url.path not in duplicates]
+            enriched: List[List[str]] = [page.words for _, _, page in stored]
+            saved: int = await save_documents(enriched, [page.title for _, _, page in stored],
+                                              tuple(response for _, response, _ in stored), Scraper.logger,
+                                              self.settings.docs_format, self.settings.docs_positions,
+                                              replace=self.settings.recrawl,
+                                              fingerprints=[page.fingerprint for _, _, page in stored])
+            await save_words(enriched, Scraper.logger, *self._bulk_options())
+            if duplicates and self.settings.dedup == 'link':
+                await dump_duplicates(duplicates, Scraper.logger, *self._bulk_options())
+
+            processed: Set[str] = self._filter_urls({result.url.path for result in results})
+            for url in processed:
+                self.visited.add(url)
+            await dump_visited_urls(processed | {url for url, _, _ in batch}, Scraper.logger, *self._bulk_options())
+            await dump_validators({url: get_validators(response.headers) for url, response, _ in batch},
+                                  Scraper.logger, *self._bulk_options())
+
+            if not self.settings.recrawl:
+                found_refs: Set[str] = self._filter_urls(self._find_hrefs([page for _, _, page in batch]))
+                for url in found_refs:
+                    self.visited.add(url)
+                if self.spool is not None:
+                    owned, foreign = self.spool.split(found_refs)
+                    self.spool.send(foreign)
+                    self.queue.extend(owned)
+                else:
+                    self.queue.extend(found_refs)
+
+            # a recrawl pass counts fetched pages, a crawl counts new documents: near-duplicates
+            # that are not stored leave room for other pages
+            self.scraped += len(batch) if self.settings.recrawl else saved
+            self.duplicates += len(duplicates)
+            PAGES.inc(len(batch), 'persisted')
+            if duplicates:
+                PAGES.inc(len(duplicates), 'duplicate')
+            self.in_flight -= len(batch)
+            self.in_progress.difference_update(url for url, _, _ in batch)
+            self._checkpoint()
+            self._account('persist', len(batch), time.monotonic() - start)
+            self.frontier_updated.set()
 
-                enriched: List[List[str]] = list(map(lambda r: enrich_text(get_text(r)), results))
-                await save_documents(enriched, results, Scraper.logger)
-                await save_words(enriched, Scraper.logger)
+            Scraper.logger.info("Scraped: %s, unchanged: %s, duplicates: %s",
+                                self.scraped, self.unchanged, self.duplicates)
+            self._log_stages()
+
+    async def _exchange_stage(self) -> None:
+        since: float = time.time()
+        previous: Optional[List[Tuple]] = None
+        while True:
+            urls, paths = self.spool.receive()
+            if paths:
+                self.queue.extend(url for url in urls if self.visited.add(url))
+                self._checkpoint()
+                self.spool.acknowledge(paths)
+                self.frontier_updated.set()
+
+            idle: bool = not paths and not self.in_flight and not self._can_claim()
+            self.spool.publish(idle)
+            if idle:
+                snapshot: List[Dict] = self.spool.snapshot()
+                current: List[Tuple] = [(status.get('sent'), status.get('received')) for status in snapshot]
+                if ShardSpool.is_quiescent(snapshot, since) and current == previous:
+                    Scraper.logger.info("All %s shards are idle", self.settings.shards)
+                    self.finished = True
+                    self.frontier_updated.set()
+                    return
+                previous = current
+            else:
+                previous = None
+            await asyncio.sleep(self.settings.shard_poll_interval)
+
+    def _toggle_profiler(self) -> None:
+        # SIGUSR1 samples the crawl loop for profile_seconds, a second signal stops it early
+        if self.profiler is not None:
+            self._dump_profile()
+            return
+        loop = asyncio.get_running_loop()
+        self.profiler = SamplingProfiler(rate=self.settings.profile_rate, loop=loop)
+        self.profiler.start()
+        self.profile_timer = loop.call_later(self.settings.profile_seconds, self._dump_profile)
+        Scraper.logger.info("Profiling the crawl loop for %s s", self.settings.profile_seconds)
+
+    def _dump_profile(self) -> None:
+        self.profile_timer.cancel()
+        self.profiler.stop()
+        path: str = os.path.join(self.settings.state_dir, f"profile-{os.getpid()}-{int(time.time())}.folded")
+        with open(path, 'w') as f:
+            f.write(self.profiler.collapsed())
+        Scraper.logger.info("Profile of %s samples in %.1f s written to %s, hottest stacks per sample:",
+                            self.profiler.samples, self.profiler.elapsed, path)
+        # a waiting task is counted on every sample, so await stacks may go above 1
+        for stack, count in self.profiler.hottest(10):
+            Scraper.logger.info("%7.2f %s", count / max(self.profiler.samples, 1),
+                                ' <- '.join(reversed(stack.split(';')[-4:])))
+        self.profiler = None
+
+    async def _drain(self, fetchers: List[asyncio.Task], enrichers: List[asyncio.Task], persister: asyncio.Task,
+                     exchange: Optional[asyncio.Task], pages: asyncio.Queue, parsed: asyncio.Queue) -> None:
+        await asyncio.gather(*fetchers)
+        if exchange is not None:
+            await exchange
+        for _ in enrichers:
+            await pages.put(None)
+        await asyncio.gather(*enrichers)
+        await parsed.put(None)
+        await persister
+
+    @staticmethod
+    async def _supervise(tasks: List[asyncio.Task]) -> None:
+        # Stages only stop on their own once the crawl is drained, so a failed stage would leave the
+        # others waiting on it forever: cancel them and re-raise the failure instead
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        errors: List[BaseException] = [task.exception() for task in done
+                                       if not task.cancelled() and task.exception() is not None]
+        if errors:
+            raise errors[0]
+
+    async def run(self):
+        start: float = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=self.settings.workers, initializer=init_worker) as pool:
+            # Workers start and load the NLTK models while the crawl state is read
+            workers_ready = asyncio.gather(*(loop.run_in_executor(pool, check_worker)
+                                             for _ in range(self.settings.workers)))
+            await ensure_indexes(Scraper.logger)
+            await self._load_scraper_state()
+            try:
+                await workers_ready
+            except BrokenProcessPool:
+                Scraper.logger.error("Enrichment workers failed to start, check that the NLTK data is installed")
+                raise
+            Scraper.logger.info("Ready to crawl in %.2f s", time.monotonic() - start)
 
-                processed: Set[str] = self._filter_urls({result.url.path for result in results})
-                await dump_visited_urls(processed, Scraper.logger)
-                self.visited |= processed
+            pages: asyncio.Queue = asyncio.Queue(maxsize=self.settings.pages_queue_size)
+            parsed: asyncio.Queue = asyncio.Queue(maxsize=self.settings.pages_queue_size)
+            self.frontier_updated = asyncio.Event()
+            self.started = time.monotonic()
+            metrics_server: Optional[asyncio.AbstractServer] = None
+            if self.settings.metrics_port:
+                metrics_server = await serve_metrics(self.settings.metrics_host, self.settings.metrics_port)
+            if hasattr(signal, 'SIGUSR1'):
+                loop.add_signal_handler(signal.SIGUSR1, self._toggle_profiler)
 
-                found_refs: Set[str] = self._filter_urls(self._find_hrefs(results))
-                await dump_pending_urls(found_refs, Scraper.logger)
-                self.queue.extend(found_refs)
+            limits = Limits(max_connections=self.settings.max_connections,
+                            max_keepalive_connections=self.settings.max_keepalive_connections,
+                            keepalive_expiry=self.settings.keepalive_expiry)
+            async with AsyncClient(http2=self.settings.http2, limits=limits) as client:
+                fetchers = [asyncio.create_task(self._fetch_stage(client, pages))
+                            for _ in range(self.settings.fetchers)]
+                enrichers = [asyncio.create_task(self._enrich_stage(pages, parsed, pool))
+                             for _ in range(self.settings.workers)]
+                persister = asyncio.create_task(self._persist_stage(parsed))
+                stages: List[asyncio.Task] = fetchers + enrichers + [persister]
+                exchange: Optional[asyncio.Task] = None
+                if self.spool is not None:
+                    exchange = asyncio.create_task(self._exchange_stage())
+                    stages.append(exchange)
+                drain = asyncio.create_task(self._drain(fetchers, enrichers, persister, exchange, pages, parsed))
+                await self._supervise(stages + [drain])
 
-                Scraper.logger.info("Scraped: %s", len(self.visited))
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        if hasattr(signal, 'SIGUSR1'):
+            loop.remove_signal_handler(signal.SIGUSR1)
+        if self.profiler is not None:
+            self._dump_profile()
 
-        await save_bigrams()
+        Scraper.logger.info("Scraped: %s, unchanged: %s, duplicates: %s",
+                            self.scraped, self.unchanged, self.duplicates)
+        self._checkpoint()
+        self.queue.close()
+        self.visited.close()
+        close_database()
@@ -1 +1,2 @@
-from text_enrich.enrich import get_text, enrich_text
+from text_enrich.page import Page
+from text_enrich.worker import init_worker, check_worker, parse_page
@@ -4,19 +4,28 @@ import bs4
 
 from httpx import Response
 from bs4 import BeautifulSoup
-from typing import Set, List
+from typing import Optional, Set, List
 
 from nltk import tokenize, stem
 
 from nltk.corpus import stopwords
 
+from dedup import simhash
+from text_enrich.page import Page
+
+stops: Optional[Set] = None
+stemmer: Optional[stem.PorterStemmer] = None
+
+
+def init_worker() -> None:
+    global stops, stemmer
+    stops = set(stopwords.words("english"))
+    stemmer = stem.PorterStemmer()
+    nltk.pos_tag(tokenize.word_tokenize(tokenize.sent_tokenize("Load the models.")[0]))
 
-def get_text(response: Response) -> str:
-    if not response:
-        return ""
 
-    soup = BeautifulSoup(response.text, features="html.parser")
-    output = ""
+def get_soup_text(soup: BeautifulSoup) -> str:
+    parts: List[str] = []
     for t in soup.find(id='mw-content-text').find_all(text=True):
         if isinstance(t, (bs4.Comment, bs4.Declaration, bs4.Stylesheet, bs4.Script)):
             continue
@@ -27,16 +36,35 @@ def get_text(response: Response) -> str:
             pass
         if t.parent.name == 'a':
             continue
-        output += str(t) + " "
-    return re.sub("[^\w\s]", " ", output)
+        parts.append(str(t))
+        parts.append(" ")
+    return re.sub("[^\w\s]", " ", "".join(parts))
+
+
+def get_text(response: Response, features: str = "html.parser") -> str:
+    if not response:
+        return ""
+    return get_soup_text(BeautifulSoup(response.text, features=features))
+
+
+def parse_page(html: str, features: str = "html.parser", shingle_size: int = 0) -> Page:
+    soup = BeautifulSoup(html, features=features)
+    title = soup.find(id='firstHeading')
+    words: List[str] = enrich_text(get_soup_text(soup))
+    return Page(
+        words=words,
+        title=title.get_text() if title else "",
+        hrefs=[a['href'] for a in soup.find_all('a', href=True)],
+        fingerprint=simhash(words, shingle_size) if shingle_size else None
+    )
 
 
 def enrich_text(text: str) -> List[str]:
+    if stemmer is None:
+        init_worker()
+
     result: List[str] = []
     exclude_set: Set = {"DT", "EX", "UH", "MD", "IN"}
-    stops: Set = set(stopwords.words("english"))
-
-    stemmer = stem.PorterStemmer()
 
     tokenized = tokenize.sent_tokenize(text)
     for sen in tokenized:
@@ -0,0 +1,8 @@
+from typing import List, NamedTuple, Optional
+
+
+class Page(NamedTuple):
+    words: List[str]
+    title: str
+    hrefs: List[str]
+    fingerprint: Optional[int] = None
@@ -0,0 +1,17 @@
+from text_enrich.page import Page
+
+
+# Entry points of the enrichment pool. NLTK and bs4 are imported by the pool processes only,
+# the crawl loop itself never needs them.
+def init_worker() -> None:
+    from text_enrich import enrich
+    enrich.init_worker()
+
+
+def check_worker() -> bool:
+    return True
+
+
+def parse_page(html: str, features: str = "html.parser", shingle_size: int = 0) -> Page:
+    from text_enrich import enrich
+    return enrich.parse_page(html, features, shingle_size)
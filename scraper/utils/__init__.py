@@ -1,2 +1,4 @@
 from utils.arg_parser import ArgParser
 from utils.settings import Settings
+from common.metrics import Counter, Gauge, Histogram, REGISTRY, serve_metrics
+from common.profiler import SamplingProfiler
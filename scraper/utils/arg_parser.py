@@ -18,27 +18,179 @@ class ArgParser:
             default=Settings.log_level
         )
 
+        self.parser.add_argument(
+            '--mongo_uri',
+            help='MongoDB connection string',
+            default=Settings.mongo_uri
+        )
+
         self.parser.add_argument(
             '--rps',
-            help='Requests per second',
+            help='Max requests per second to one host',
             type=int,
             default=Settings.rps
         )
 
+        self.parser.add_argument(
+            '--min_rps',
+            help='Floor of the adaptive per host request rate',
+            type=float,
+            default=Settings.min_rps
+        )
+
+        self.parser.add_argument(
+            '--latency_target',
+            help='Response time in seconds above which the host rate is lowered',
+            type=float,
+            default=Settings.latency_target
+        )
+
+        self.parser.add_argument(
+            '--max_retries',
+            help='Retries of a throttled or failed request',
+            type=int,
+            default=Settings.max_retries
+        )
+
+        self.parser.add_argument(
+            '--http2',
+            help='Negotiate HTTP/2 with hosts that support it',
+            action='store_true'
+        )
+
+        self.parser.add_argument(
+            '--max_connections',
+            help='Max count of open connections in the client pool',
+            type=int,
+            default=Settings.max_connections
+        )
+
+        self.parser.add_argument(
+            '--max_keepalive_connections',
+            help='Max count of idle connections kept open in the client pool',
+            type=int,
+            default=Settings.max_keepalive_connections
+        )
+
+        self.parser.add_argument(
+            '--recrawl',
+            help='Refetch visited URL with conditional requests instead of crawling the frontier',
+            action='store_true'
+        )
+
         self.parser.add_argument(
             '--batch_size',
-            help='Batch size',
+            help='Max count of pages persisted at once',
             type=int,
             default=Settings.batch_size
         )
 
         self.parser.add_argument(
             '--docs_count',
-            help='Count of documents to be scraped',
+            help='Count of documents in the corpus, documents stored by earlier runs included '
+                 '(count of pages per recrawl pass with --recrawl)',
             type=int,
             dest="max_scraped_count",
             default=Settings.max_scraped_count
         )
 
+        self.parser.add_argument(
+            '--fetchers',
+            help='Count of concurrent page fetchers',
+            type=int,
+            default=Settings.fetchers
+        )
+
+        self.parser.add_argument(
+            '--workers',
+            help='Count of text enrichment processes',
+            type=int,
+            default=Settings.workers
+        )
+
+        self.parser.add_argument(
+            '--parser',
+            help='BeautifulSoup parser backend',
+            choices=['html.parser', 'lxml'],
+            dest="html_parser",
+            default=Settings.html_parser
+        )
+
+        self.parser.add_argument(
+            '--bulk_chunk_size',
+            help='Count of upserts in one bulk write',
+            type=int,
+            default=Settings.bulk_chunk_size
+        )
+
+        self.parser.add_argument(
+            '--bulk_concurrency',
+            help='Count of concurrent bulk writes per collection',
+            type=int,
+            default=Settings.bulk_concurrency
+        )
+
+        self.parser.add_argument(
+            '--state_dir',
+            help='Directory for the crawl frontier and the visited URL filter',
+            default=Settings.state_dir
+        )
+
+        self.parser.add_argument(
+            '--docs_format',
+            help='Layout of stored documents: full word list or term counts',
+            choices=['words', 'terms'],
+            default=Settings.docs_format
+        )
+
+        self.parser.add_argument(
+            '--docs_positions',
+            help='Store delta-encoded term positions with term counts',
+            action='store_true'
+        )
+
+        self.parser.add_argument(
+            '--dedup',
+            help='Near-duplicate pages: store anyway, skip them or record a link to the original',
+            choices=['off', 'skip', 'link'],
+            default=Settings.dedup
+        )
+
+        self.parser.add_argument(
+            '--dedup_threshold',
+            help='Max SimHash bit difference of near-duplicate pages',
+            type=int,
+            default=Settings.dedup_threshold
+        )
+
+        self.parser.add_argument(
+            '--metrics_port',
+            help='Port of the Prometheus metrics endpoint, 0 disables it',
+            type=int,
+            default=Settings.metrics_port
+        )
+
+        self.parser.add_argument(
+            '--profile_seconds',
+            help='Duration of the crawl loop profile started by SIGUSR1',
+            type=float,
+            default=Settings.profile_seconds
+        )
+
+        self.parser.add_argument(
+            '--shards',
+            help='Count of crawl processes splitting the URL space by hash',
+            type=int,
+            default=Settings.shards
+        )
+
+        self.parser.add_argument(
+            '--shard_id', '--shard-id',
+            help='Hash partition of the URL space owned by this process',
+            type=int,
+            dest='shard_id',
+            default=Settings.shard_id
+        )
+
     def parse(self) -> Dict:
         return vars(self.parser.parse_args())
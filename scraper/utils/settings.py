@@ -1,12 +1,53 @@
 import dataclasses
 import logging
+import os
 
 
 @dataclasses.dataclass
 class Settings:
     log_level: int = logging.INFO
+    mongo_uri: str = "mongodb://localhost:27017"
+    mongo_database: str = "IR"
+    mongo_pool_size: int = 100
+    mongo_write_concern: str = "1"
+    mongo_read_preference: str = "primary"
     start_url: str = "https://en.wikipedia.org/wiki/Main_Page"
     url_base: str = "https://en.wikipedia.org"
     rps: int = 20
+    min_rps: float = 1
+    rps_increase: float = 1
+    rps_decrease: float = 0.5
+    latency_target: float = 2
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_cap: float = 30
+    max_redirects: int = 5
+    http2: bool = False
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5
+    recrawl: bool = False
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0
+    profile_rate: float = 100
+    profile_seconds: float = 30
+    shards: int = 1
+    shard_id: int = 0
+    shard_poll_interval: float = 0.2
     batch_size: int = 5
     max_scraped_count: int = 20
+    workers: int = os.cpu_count() or 1
+    fetchers: int = 16
+    pages_queue_size: int = 64
+    html_parser: str = "html.parser"
+    bulk_chunk_size: int = 1000
+    bulk_concurrency: int = 4
+    state_dir: str = "state"
+    frontier_buffer_size: int = 100000
+    bloom_capacity: int = 10_000_000
+    bloom_error_rate: float = 1e-4
+    docs_format: str = "words"
+    docs_positions: bool = False
+    dedup: str = "off"
+    dedup_threshold: int = 4
+    dedup_shingle: int = 2
@@ -1,11 +1,12 @@
-from flask import Flask, render_template, request, url_for, flash, redirect
+from quart import Quart, render_template, request, url_for, flash, redirect
 
-from search_helper import BigramIndex
-from request_enrich import get_enriched_words
-from db import get_documents
+from search_helper import BigramIndex, SpellingIndex, DeleteIndex
+from request_enrich import Normalizer
+from engine_client import EngineClient
+from db import get_documents, documents_cache, configure_database, close_database, ensure_indexes
 
-from utils import Settings
-from typing import List, Dict
+from utils import Settings, ResultCache, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE, SamplingProfiler
+from typing import List, Dict, Optional
 
 import coloredlogs
 import logging
@@ -13,36 +14,168 @@ import asyncio
 import httpx
 import time
 import ast
+import os
 
 
-loop = asyncio.get_event_loop()
-
 logger = logging.getLogger(__name__)
 logger.setLevel(level=logging.DEBUG)
 coloredlogs.install(level=logging.DEBUG)
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = Settings().secret
+settings = Settings()
+configure_database(settings)
+
+app = Quart(__name__)
+app.config['SECRET_KEY'] = settings.secret
+app.config['RESPONSE_TIMEOUT'] = settings.request_timeout
+
+spelling_index = SpellingIndex(n=settings.spelling_ngram, refresh_period=settings.spelling_refresh_period,
+                               refresh_overlap=settings.spelling_refresh_overlap)
+results_cache = ResultCache(maxsize=settings.results_cache_size, ttl=settings.results_cache_ttl,
+                            max_bytes=settings.results_cache_max_bytes)
+engine_client: Optional[EngineClient] = None
+search_limiter: Optional[asyncio.Semaphore] = None
+generation_watcher: Optional[asyncio.Task] = None
+normalizer: Optional[Normalizer] = None
+delete_index: Optional[DeleteIndex] = None
+delete_index_lock: Optional[asyncio.Lock] = None
+warm_up_task: Optional[asyncio.Task] = None
+warm_up_seconds: Optional[float] = None
+profiled_requests: int = 0
+profile_done: Optional[asyncio.Event] = None
+
+SEARCHES = Counter('web_searches_total', 'Search requests')
+ENGINE_ERRORS = Counter('web_engine_errors_total', 'Failed search engine requests')
+SPELLING_SECONDS = Histogram('web_spelling_seconds', 'Spelling correction time')
+ENGINE_SECONDS = Histogram('web_engine_seconds', 'Search engine request time')
+HYDRATION_SECONDS = Histogram('web_hydration_seconds', 'Result documents lookup time')
+Gauge('web_results_cache_hits_total', 'Results cache hits', lambda: results_cache.hits, kind='counter')
+Gauge('web_results_cache_misses_total', 'Results cache misses', lambda: results_cache.misses, kind='counter')
+Gauge('web_documents_cache_hits_total', 'Documents cache hits', lambda: documents_cache.hits, kind='counter')
+Gauge('web_documents_cache_misses_total', 'Documents cache misses', lambda: documents_cache.misses, kind='counter')
+Gauge('web_spelling_index_words', 'Words in the spelling index', lambda: len(spelling_index))
+
+
+async def watch_engine_generation() -> None:
+    while True:
+        await asyncio.sleep(settings.engine_generation_period)
+        try:
+            results_cache.set_generation(await engine_client.get_generation())
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            logger.warning("Can't get search engine index generation: %r", e)
+
+
+async def sync_delete_index() -> None:
+    # hashing the delete variants of new words is CPU-bound, keep it off the event loop;
+    # the lock keeps a single writer to the overlay
+    async with delete_index_lock:
+        await asyncio.get_running_loop().run_in_executor(None, delete_index.sync, spelling_index)
+
+
+async def warm_up() -> None:
+    # Runs once the server listens: /health reports ready and searches proceed when it is done
+    global normalizer, delete_index, warm_up_seconds
+    start = time.monotonic()
+    loop = asyncio.get_running_loop()
+    normalizer = Normalizer(stem_cache_size=settings.stem_cache_size)
+    if settings.warm_up:
+        await loop.run_in_executor(None, normalizer.warm_up)
+
+    await ensure_indexes(logger)
+    await spelling_index.refresh(logger)
+    logger.info("Spelling index loaded: %s words", len(spelling_index))
+
+    if settings.correction_mode == 'symmetric_delete':
+        if os.path.exists(settings.delete_index_path):
+            delete_index = DeleteIndex.load(settings.delete_index_path)
+        else:
+            logger.warning("No delete index at %s, building it from the spelling index", settings.delete_index_path)
+            delete_index = await loop.run_in_executor(None, DeleteIndex.build, spelling_index.words,
+                                                      settings.delete_index_distance)
+            await loop.run_in_executor(None, delete_index.save, settings.delete_index_path)
+        await sync_delete_index()
+        logger.info("Delete index loaded: %s words, %s bytes", len(delete_index), delete_index.nbytes)
+
+    if settings.warm_up:
+        # first correction builds the numpy snapshot of the spelling index
+        await loop.run_in_executor(None, BigramIndex(['warmupx'], spelling_index, delete_index=delete_index).build,
+                                   logger)
+        try:
+            results_cache.set_generation(await engine_client.get_generation())
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            logger.warning("Can't reach search engine on warm-up: %r", e)
+
+    warm_up_seconds = time.monotonic() - start
+    logger.info("Warmed up in %.2f s", warm_up_seconds)
+
+
+def log_warm_up_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Warm-up failed, the app is not ready: %r", task.exception())
+
+
+@app.before_serving
+async def startup() -> None:
+    global engine_client, search_limiter, delete_index_lock, generation_watcher, warm_up_task
+    engine_client = EngineClient(settings.engine_url, timeout=settings.engine_timeout,
+                                 max_connections=settings.engine_max_connections,
+                                 batch_size=settings.engine_batch_size)
+    search_limiter = asyncio.Semaphore(settings.max_concurrency)
+    delete_index_lock = asyncio.Lock()
+    documents_cache.maxsize = settings.documents_cache_size
+    generation_watcher = asyncio.create_task(watch_engine_generation())
+    warm_up_task = asyncio.create_task(warm_up())
+    warm_up_task.add_done_callback(log_warm_up_failure)
+
+
+@app.after_serving
+async def shutdown() -> None:
+    warm_up_task.cancel()
+    generation_watcher.cancel()
+    await engine_client.aclose()
+    close_database()
+
+
+async def find_documents(search_engine_request: List[str]) -> List[Dict]:
+    key = tuple(search_engine_request)
+    results: Optional[List[Dict]] = results_cache.get(key)
+    if results is not None:
+        logger.debug("Results cache hit for %s", search_engine_request)
+        return results
+
+    async with search_limiter:
+        start = time.time()
+        response: Dict = await engine_client.search(search_engine_request)
+        end = time.time()
+        ENGINE_SECONDS.observe(end - start)
+        logger.debug("Search engine request time [sec]: %s", end - start)
+
+        results_cache.set_generation(response.get("generation"))
+        doc_ids: List = response["doc_ids"]
+        logger.debug("Got %s documents in search engine", len(doc_ids))
+        with HYDRATION_SECONDS.time():
+            results = await get_documents(doc_ids)
+        logger.debug("Response: %s", results)
+        logger.debug("Documents cache: %s", documents_cache.stats())
+
+    results_cache.put(key, results)
+    return results
 
 
 @app.route('/result/<search_engine_request>&<enriched_request>', methods=('POST', 'GET'))
-def result(search_engine_request=None, enriched_request=None):
+async def result(search_engine_request=None, enriched_request=None):
     if type(search_engine_request) is str:
         search_engine_request = ast.literal_eval(search_engine_request)
     if type(enriched_request) is str:
         enriched_request = ast.literal_eval(enriched_request)
 
-    start = time.time()
-    search_engine_response = httpx.post('http://localhost:8080/search',
-                                        json={'words': search_engine_request},
-                                        timeout=None)
-    end = time.time()
-    logger.debug("Search engine request time [sec]: %s", end - start)
-
-    doc_ids: List = search_engine_response.json()["doc_ids"]
-    logger.debug("Got %s documents in search engine", len(doc_ids))
-    results = loop.run_until_complete(get_documents(doc_ids))
-    logger.debug("Response: %s", results)
+    await asyncio.shield(warm_up_task)
+    try:
+        results: List[Dict] = await find_documents(search_engine_request)
+    except (httpx.HTTPError, ValueError, KeyError) as e:
+        ENGINE_ERRORS.inc()
+        logger.error("Search engine request failed: %r", e)
+        await flash('Search engine is unavailable, try again later')
+        return redirect(url_for('search'))
 
     is_changed: bool = False
     front_request: List[Dict] = []
@@ -53,22 +186,27 @@ def result(search_engine_request=None, enriched_request=None):
         else:
             front_request.append({"word": changed, "color": "black"})
 
-    return render_template('result.html',
-                           results=results, changed_request=front_request,
-                           show_hidden=is_changed, original_request=enriched_request)
+    return await render_template('result.html',
+                                 results=results, changed_request=front_request,
+                                 show_hidden=is_changed, original_request=enriched_request)
 
 
 @app.route('/', methods=('POST', 'GET'))
-def search(search_request=None):
+async def search(search_request=None):
     if request.method == 'POST':
-        search_request = request.form['request']
+        search_request = (await request.form)['request']
         if not search_request:
-            flash('Request is required!')
+            await flash('Request is required!')
         else:
-            enriched_request: List[str] = get_enriched_words(search_request)
+            SEARCHES.inc()
+            await asyncio.shield(warm_up_task)
+            enriched_request: List[str] = normalizer(search_request)
 
-            bi: BigramIndex = BigramIndex(enriched_request)
-            loop.run_until_complete(bi.build(logger))
+            if await spelling_index.refresh_if_stale(logger) and delete_index is not None:
+                await sync_delete_index()
+            bi: BigramIndex = BigramIndex(enriched_request, spelling_index, delete_index=delete_index)
+            with SPELLING_SECONDS.time():
+                bi.build(logger)
 
             search_dict: Dict = bi.get_search_dict()
             logger.debug("Supposed request structure: %s", search_dict)
@@ -76,9 +214,75 @@ def search(search_request=None):
             search_engine_request: List = [supposed[0] for supposed in search_dict.values()]
             logger.debug("Request for search engine: %s", search_engine_request)
 
-            return result(search_engine_request=search_engine_request, enriched_request=enriched_request)
+            return await result(search_engine_request=search_engine_request, enriched_request=enriched_request)
+
+    return await render_template('search.html', search_request=search_request)
+
+
+@app.route('/health', methods=('GET',))
+async def health():
+    if warm_up_task is None or not warm_up_task.done():
+        return {'status': 'starting'}, 503
+    if warm_up_task.cancelled() or warm_up_task.exception() is not None:
+        return {'status': 'failed', 'error': repr(None if warm_up_task.cancelled() else warm_up_task.exception())}, 503
+    return {'status': 'ready', 'warm_up_seconds': warm_up_seconds, 'spelling_index_words': len(spelling_index)}
+
+
+@app.route('/stats', methods=('GET',))
+async def stats():
+    return {
+        'results_cache': results_cache.stats(),
+        'documents_cache': documents_cache.stats(),
+    }
+
+
+@app.route('/metrics', methods=('GET',))
+async def metrics():
+    return REGISTRY.render(), 200, {'Content-Type': CONTENT_TYPE}
+
+
+@app.after_request
+async def count_profiled_request(response):
+    global profiled_requests
+    if profile_done is not None and not request.path.startswith('/admin/'):
+        profiled_requests -= 1
+        if profiled_requests <= 0:
+            profile_done.set()
+    return response
+
+
+@app.route('/admin/profile', methods=('GET',))
+async def profile():
+    # Samples the event loop until `requests` more requests are served or for `seconds`,
+    # answers with collapsed stacks for flame graph tools.
+    global profiled_requests, profile_done
+    if not settings.admin_token or request.headers.get('X-Admin-Token') != settings.admin_token:
+        return 'Not found', 404
+    if profile_done is not None:
+        return 'Profiling is already running', 409
+
+    requests: int = request.args.get('requests', 0, type=int)
+    seconds: float = min(request.args.get('seconds', settings.profile_seconds, type=float),
+                         settings.request_timeout - 1)
+    profiler = SamplingProfiler(rate=request.args.get('rate', settings.profile_rate, type=float),
+                                loop=asyncio.get_running_loop())
+    profiled_requests = requests
+    profile_done = asyncio.Event()
+    profiler.start()
+    try:
+        if requests:
+            await asyncio.wait_for(profile_done.wait(), seconds)
+        else:
+            await asyncio.sleep(seconds)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        profiler.stop()
+        profile_done = None
+    logger.info("Profiled %s samples in %.1f s", profiler.samples, profiler.elapsed)
 
-    return render_template('search.html')
+    return profiler.collapsed(), 200, {'Content-Type': 'text/plain; charset=utf-8',
+                                       'X-Profile-Samples': str(profiler.samples)}
 
 
 if __name__ == '__main__':
@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+import coloredlogs
+import logging
+import time
+
+from typing import List
+
+from db import configure_database, close_database, iterate_words
+from search_helper import DeleteIndex
+from utils import Settings
+
+
+async def load_words() -> List[str]:
+    return [record['word'] async for record in iterate_words()]
+
+
+if __name__ == "__main__":
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Build the symmetric delete correction index from WordsStorage")
+    parser.add_argument('--path', default=settings.delete_index_path)
+    parser.add_argument('--distance', type=int, default=settings.delete_index_distance)
+    args = parser.parse_args()
+
+    logger = logging.getLogger(__name__)
+    coloredlogs.install(level=logging.INFO)
+    configure_database(settings)
+
+    start = time.perf_counter()
+    words: List[str] = asyncio.run(load_words())
+    close_database()
+    logger.info("Loaded %s words in %.1f s", len(words), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    index = DeleteIndex.build(words, args.distance)
+    index.save(args.path)
+    logger.info("Built delete index of %s keys, %s bytes in %.1f s",
+                len(index.keys), index.nbytes, time.perf_counter() - start)
@@ -1,3 +1,4 @@
+from db.client import configure_database, get_database, close_database, ensure_indexes
 from db.get_bigrams import get_words_by_bigrams
-from db.dictionary import check_if_exists
-from db.get_documents import get_documents
+from db.dictionary import check_if_exists, iterate_words
+from db.get_documents import get_documents, documents_cache
@@ -1,7 +1,14 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import AsyncIterator, Dict, Optional
 
-client = AsyncIOMotorClient()
+from db.client import get_database
+from bson.objectid import ObjectId
 
 
 async def check_if_exists(word: str) -> bool:
-    return await client.IR.WordsStorage.count_documents({'word': word}) > 0
+    return await get_database().WordsStorage.count_documents({'word': word}) > 0
+
+
+async def iterate_words(after: Optional[ObjectId] = None) -> AsyncIterator[Dict]:
+    query: Dict = {'_id': {'$gt': after}} if after is not None else {}
+    async for record in get_database().WordsStorage.find(query, {'word': 1}).sort('_id', 1):
+        yield record
@@ -1,14 +1,12 @@
 from typing import List, Dict, Set
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
-client = AsyncIOMotorClient()
+from db.client import get_database
 
 
 async def get_words_by_bigrams(bigrams: Set[str]) -> Dict:
     result: Dict = dict()
     for bigram in bigrams:
-        async for record in client.IR.BigramStorage.find({'bigram': bigram}):
+        async for record in get_database().BigramStorage.find({'bigram': bigram}):
             words: List[str] = record['words']
             result[bigram] = words
     return result
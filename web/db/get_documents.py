@@ -1,15 +1,29 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from db.client import get_database
 from bson.objectid import ObjectId
 
-client = AsyncIOMotorClient()
+from utils.lru_cache import LRUCache
+
+documents_cache: LRUCache = LRUCache(maxsize=10000)
 
 
 async def get_documents(doc_bytes: List) -> List[Dict]:
-    doc_ids: List = [ObjectId(bytes(doc_bytes_i)) for doc_bytes_i in doc_bytes]
-    result: List[Dict] = []
-    for doc_id in doc_ids:
-        async for record in client.IR.DocsStorage.find({'_id': doc_id}):
-            result.append({"url": "https://en.wikipedia.org" + record["path"], "title": record["title"]})
-    return result
\ No newline at end of file
+    doc_ids: List[ObjectId] = [ObjectId(bytes(doc_bytes_i)) for doc_bytes_i in doc_bytes]
+
+    found: Dict[ObjectId, Tuple[str, str]] = dict()
+    missing: List[ObjectId] = []
+    for doc_id in dict.fromkeys(doc_ids):
+        doc = documents_cache.get(doc_id)
+        if doc is None:
+            missing.append(doc_id)
+        else:
+            found[doc_id] = doc
+
+    if missing:
+        async for record in get_database().DocsStorage.find({'_id': {'$in': missing}}, {'path': 1, 'title': 1}):
+            doc = ("https://en.wikipedia.org" + record["path"], record["title"])
+            documents_cache.put(record['_id'], doc)
+            found[record['_id']] = doc
+
+    return [{"url": found[doc_id][0], "title": found[doc_id][1]} for doc_id in doc_ids if doc_id in found]
@@ -0,0 +1 @@
+from engine_client.client import EngineClient
@@ -0,0 +1,59 @@
+import asyncio
+import httpx
+
+from typing import Dict, List, Optional
+
+
+class EngineClient:
+    # Pooled client for the search engine. Batches are split into chunks of batch_size
+    # queries which are sent concurrently over the pool, at most max_connections at a time.
+    def __init__(self, base_url: str, timeout: float = 10, max_connections: int = 32,
+                 batch_size: int = 64, http2: bool = False) -> None:
+        self.batch_size: int = batch_size
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            http2=http2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def __aenter__(self) -> 'EngineClient':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _post(self, path: str, body: Dict, timeout: Optional[float]) -> Dict:
+        kwargs: Dict = {'timeout': timeout} if timeout is not None else {}
+        response: httpx.Response = await self.client.post(path, json=body, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_generation(self, timeout: Optional[float] = None) -> int:
+        kwargs: Dict = {'timeout': timeout} if timeout is not None else {}
+        response: httpx.Response = await self.client.get('/generation', **kwargs)
+        response.raise_for_status()
+        return response.json()['generation']
+
+    async def search(self, words: List[str], timeout: Optional[float] = None) -> Dict:
+        return await self._post('/search', {'words': words}, timeout)
+
+    async def search_batch(self, queries: List[List[str]], timeout: Optional[float] = None) -> Dict:
+        # timeout bounds every chunk request; the result keeps the order of queries and
+        # reports the oldest index generation any chunk was answered from
+        if not queries:
+            return {'doc_ids': [], 'generation': None}
+        chunks: List[List[List[str]]] = [queries[i:i + self.batch_size]
+                                         for i in range(0, len(queries), self.batch_size)]
+        responses: List[Dict] = await asyncio.gather(
+            *(self._post('/search_batch', {'queries': chunk}, timeout) for chunk in chunks)
+        )
+        generations: List[int] = [response['generation'] for response in responses
+                                  if response.get('generation') is not None]
+        return {
+            'doc_ids': [doc_ids for response in responses for doc_ids in response['doc_ids']],
+            'generation': min(generations) if generations else None,
+        }
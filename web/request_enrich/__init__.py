@@ -1 +1 @@
-from request_enrich.enrich import get_enriched_words
+from request_enrich.enrich import get_enriched_words, Normalizer
@@ -1,28 +1,39 @@
 import nltk
 import re
 
-from typing import Set, List
+from functools import lru_cache
+from typing import Callable, Set, List
 
 from nltk import tokenize, stem
 
 from nltk.corpus import stopwords
 
 
-def get_enriched_words(request: str) -> List[str]:
-    request = re.sub("[^\w\s]", " ", request)
+class Normalizer:
+    def __init__(self, stem_cache_size: int = 100000) -> None:
+        self.exclude_set: Set = {"DT", "EX", "UH", "MD", "IN"}
+        self.stops: Set = set(stopwords.words("english"))
+        self.punctuation = re.compile(r"[^\w\s]")
+        self.stemmer = stem.PorterStemmer()
+        self.stem: Callable[[str], str] = lru_cache(maxsize=stem_cache_size)(self.stemmer.stem)
+
+    def warm_up(self) -> List[str]:
+        # punkt and the tagger are loaded by NLTK on first use: load them now,
+        # a missing resource raises LookupError here instead of on a request
+        return self("Warming up the normalizer of search requests.")
 
-    result: List[str] = []
-    exclude_set: Set = {"DT", "EX", "UH", "MD", "IN"}
-    stops: Set = set(stopwords.words("english"))
+    def __call__(self, request: str) -> List[str]:
+        request = self.punctuation.sub(" ", request)
 
-    stemmer = stem.PorterStemmer()
+        result: List[str] = []
+        for sen in tokenize.sent_tokenize(request):
+            words_list: List[str] = tokenize.word_tokenize(sen)
+            words_list = [w.lower() for w, ps in nltk.pos_tag(words_list)
+                          if w not in self.stops and w.isascii() and ps not in self.exclude_set]
+            result += [self.stem(w) for w in words_list]
 
-    tokenized = tokenize.sent_tokenize(request)
-    for sen in tokenized:
-        words_list: List[str] = tokenize.word_tokenize(sen)
-        words_list = [p for p in nltk.pos_tag(words_list)]
-        words_list = [w.lower() for w, ps in words_list
-                      if w not in stops and w.isascii() and ps not in exclude_set]
-        result += [stemmer.stem(w) for w in words_list]
+        return result
 
-    return result
+
+def get_enriched_words(request: str) -> List[str]:
+    return Normalizer()(request)
@@ -1 +1,3 @@
 from search_helper.bigram_index import BigramIndex
+from search_helper.spelling_index import SpellingIndex
+from search_helper.delete_index import DeleteIndex
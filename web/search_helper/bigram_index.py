@@ -1,46 +1,46 @@
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set, Tuple
 from logging import Logger
 
-from db import get_words_by_bigrams, check_if_exists
-
-from search_helper.common import get_bigrams
-from search_helper.metrics import jaccard_coef, damerau_levenshtein_distance
+from search_helper.spelling_index import SpellingIndex
+from search_helper.delete_index import DeleteIndex
+from search_helper.metrics import damerau_levenshtein_distances
 
 
 class BigramIndex:
-    def __init__(self, enriched_request: List[str],
-                 count_bound: int = 3, distance_bound: float = 3) -> None:
+    def __init__(self, enriched_request: List[str], spelling_index: SpellingIndex,
+                 count_bound: int = 3, distance_bound: float = 3, candidates_bound: int = 100,
+                 delete_index: Optional[DeleteIndex] = None) -> None:
         self.req = enriched_request
+        self.spelling_index = spelling_index
         self.count_bound = count_bound
         self.distance_bound = distance_bound
+        self.candidates_bound = candidates_bound
+        self.delete_index = delete_index
         self.search_dict: Dict = dict()
 
-    async def build(self, logger: Logger) -> None:
+    def build(self, logger: Logger) -> None:
         for word in self.req:
-            if await check_if_exists(word):
+            if word in self.spelling_index:
                 logger.debug('Word "%s" exists', word)
                 self.search_dict[word] = [word]
                 continue
 
             self.search_dict[word] = []
-            bigrams: Set[str] = get_bigrams(word)
-            index: Dict = await get_words_by_bigrams(bigrams)
-
-            words: Set[str] = set()
-            for _, others in index.items():
-                for other in others:
-                    words.add(other)
-
-            coefs: List[List[float]] = []
-            for other in words:
-                coefs.append([jaccard_coef(word, other), other])
-            coefs.sort(reverse=True)
-
-            most_similar: List = [w for _, w in coefs[:100]]
-            distances: List[List[float]] = []
-            for other in most_similar:
-                distances.append([damerau_levenshtein_distance(word, other), other])
-            distances.sort()
+            if self.delete_index is not None:
+                # Words within the delete index distance are found exactly, the n-gram path
+                # remains for the rarer misspellings further away.
+                corrections: List[Tuple[float, str]] = self.delete_index.lookup(word, self.count_bound)
+                if corrections:
+                    for d, supposed in corrections:
+                        logger.debug('Supposed word "%s" with LD-distance %s', supposed, d)
+                        self.search_dict[word].append(supposed)
+                    continue
+
+            most_similar: List[str] = self.spelling_index.most_similar(word, self.candidates_bound)
+            distances: List = sorted(zip(
+                damerau_levenshtein_distances(word, most_similar, self.distance_bound).tolist(),
+                most_similar
+            ))
 
             for d, supposed in distances[:self.count_bound]:
                 logger.debug('Supposed word "%s" with LD-distance %s', supposed, d)
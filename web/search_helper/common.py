@@ -1,8 +1,9 @@
-from itertools import tee
 from typing import Set
 
 
+def get_ngrams(word: str, n: int = 2) -> Set[str]:
+    return {word[i:i + n] for i in range(len(word) - n + 1)}
+
+
 def get_bigrams(word: str) -> Set[str]:
-    lhs, rhs = tee(word)
-    next(rhs, None)
-    return set([''.join(p) for p in list(zip(lhs, rhs))])
+    return get_ngrams(word, 2)
@@ -0,0 +1,148 @@
+import json
+import math
+import os
+
+import numpy as np
+
+from array import array
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Set, Tuple
+
+from search_helper.spelling_index import SpellingIndex
+from search_helper.metrics import damerau_levenshtein_distances
+
+
+def hash_key(variant: str) -> int:
+    return int.from_bytes(blake2b(variant.encode(), digest_size=8).digest(), 'little')
+
+
+def get_deletes(word: str, max_distance: int) -> Set[str]:
+    variants: Set[str] = {word}
+    frontier: Set[str] = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class DeleteIndex:
+    # Symmetric delete correction index: every word is stored under the hashes of all its
+    # variants with up to max_distance characters deleted. Two words within max_distance edits
+    # share at least one such variant, so the candidates of a query are the union of the postings
+    # of its own delete variants, verified with the Damerau-Levenshtein distance afterwards.
+    #
+    # Postings are kept in flat arrays sorted by hash (keys, starts, ids); the top bits of a hash
+    # address a directory of key ranges, so a lookup is one directory read and a short scan.
+    # Words added after the build go to an in-memory overlay.
+    FILES: Tuple[str, ...] = ('keys', 'starts', 'ids', 'directory', 'blob', 'offsets')
+
+    def __init__(self, arrays: Dict[str, np.ndarray], max_distance: int) -> None:
+        self.max_distance: int = max_distance
+        self.keys: np.ndarray = arrays['keys']
+        self.starts: np.ndarray = arrays['starts']
+        self.ids: np.ndarray = arrays['ids']
+        self.directory: np.ndarray = arrays['directory']
+        self.blob: np.ndarray = arrays['blob']
+        self.offsets: np.ndarray = arrays['offsets']
+        self.shift: int = 64 - int(math.log2(len(self.directory) - 1))
+        self.base_count: int = len(self.offsets) - 1
+
+        self.extra: Dict[int, List[int]] = {}
+        self.extra_words: List[str] = []
+        self.synced: int = 0
+
+    @classmethod
+    def build(cls, words: Iterable[str], max_distance: int = 2) -> 'DeleteIndex':
+        hashes: array = array('Q')
+        ids: array = array('I')
+        encoded: List[bytes] = []
+        for word_id, word in enumerate(words):
+            encoded.append(word.encode())
+            variants: Set[str] = get_deletes(word, max_distance)
+            hashes.extend(hash_key(variant) for variant in variants)
+            ids.extend([word_id] * len(variants))
+
+        all_hashes: np.ndarray = np.frombuffer(hashes, dtype=np.uint64)
+        all_ids: np.ndarray = np.frombuffer(ids, dtype=np.uint32)
+        order: np.ndarray = np.lexsort((all_ids, all_hashes))
+        all_hashes, all_ids = all_hashes[order], all_ids[order]
+        keys, starts = np.unique(all_hashes, return_index=True)
+
+        bits: int = max(1, math.ceil(math.log2(max(len(keys), 1))))
+        position = np.uint32 if len(all_ids) < 2 ** 32 else np.uint64
+        buckets: np.ndarray = keys >> np.uint64(64 - bits)
+        lengths: np.ndarray = np.fromiter(map(len, encoded), dtype=np.uint64, count=len(encoded))
+        arrays: Dict[str, np.ndarray] = {
+            'keys': keys,
+            'starts': np.append(starts, len(all_ids)).astype(position),
+            'ids': all_ids,
+            'directory': np.searchsorted(buckets, np.arange(2 ** bits + 1, dtype=np.uint64)).astype(position),
+            'blob': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            'offsets': np.concatenate(([0], np.cumsum(lengths))).astype(np.uint64),
+        }
+        return cls(arrays, max_distance)
+
+    @classmethod
+    def load(cls, path: str) -> 'DeleteIndex':
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta: Dict = json.load(f)
+        arrays: Dict[str, np.ndarray] = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+                                         for name in cls.FILES}
+        return cls(arrays, meta['max_distance'])
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        for name in self.FILES:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'max_distance': self.max_distance, 'words': self.base_count}, f)
+
+    def __len__(self) -> int:
+        return self.base_count + len(self.extra_words)
+
+    def __contains__(self, word: str) -> bool:
+        return any(self.get_word(word_id) == word for word_id in self.find(hash_key(word)))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.FILES)
+
+    def get_word(self, word_id: int) -> str:
+        if word_id >= self.base_count:
+            return self.extra_words[word_id - self.base_count]
+        return self.blob[self.offsets[word_id]:self.offsets[word_id + 1]].tobytes().decode()
+
+    def find(self, key: int) -> List[int]:
+        bucket: int = key >> self.shift
+        found: List[int] = self.extra.get(key, [])
+        for i in range(int(self.directory[bucket]), int(self.directory[bucket + 1])):
+            if self.keys[i] == key:
+                return self.ids[self.starts[i]:self.starts[i + 1]].tolist() + found
+        return found
+
+    def add(self, word: str) -> bool:
+        if word in self:
+            return False
+        word_id: int = len(self)
+        self.extra_words.append(word)
+        for variant in get_deletes(word, self.max_distance):
+            self.extra.setdefault(hash_key(variant), []).append(word_id)
+        return True
+
+    def sync(self, spelling_index: SpellingIndex) -> int:
+        # The spelling index only grows, so words past the last synced position are the new ones.
+        # It may grow while this runs in a worker thread: stop at the length seen on entry.
+        end: int = len(spelling_index.words)
+        added: int = sum(self.add(word) for word in spelling_index.words[self.synced:end])
+        self.synced = end
+        return added
+
+    def lookup(self, word: str, k: int) -> List[Tuple[float, str]]:
+        word_ids: Set[int] = set()
+        for variant in get_deletes(word, self.max_distance):
+            word_ids.update(self.find(hash_key(variant)))
+        # hash collisions and deletes at different positions only add false candidates,
+        # the distance check below drops them
+        candidates: List[str] = [self.get_word(word_id) for word_id in word_ids]
+        distances: List[float] = damerau_levenshtein_distances(word, candidates, self.max_distance).tolist()
+        return sorted((d, candidate) for d, candidate in zip(distances, candidates) if d <= self.max_distance)[:k]
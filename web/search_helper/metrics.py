@@ -1,30 +1,87 @@
-from typing import Set, Dict
+import math
+import numpy as np
+
+from typing import List, Set
 
 from search_helper.common import get_bigrams
 
 
-def damerau_levenshtein_distance(lhs: str, rhs: str) -> float:
-    d: Dict = dict()
-    for i in range(-1, len(lhs) + 1):
-        d[(i, -1)] = i + 1
-    for j in range(-1, len(rhs) + 1):
-        d[(-1, j)] = j + 1
+def damerau_levenshtein_distance(lhs: str, rhs: str, bound: float = math.inf) -> float:
+    # Rows of the (len(lhs) + 1) x (len(rhs) + 1) matrix, shifted by one column so that
+    # row[0] holds d(i, -1). Only the last three rows are needed for transpositions.
+    n: int = len(rhs)
+    before: List[float] = []
+    prev: List[float] = list(range(n + 1))
+    cur: List[float] = [0] * (n + 1)
+    prev_min: float = 0
 
     for i in range(len(lhs)):
-        for j in range(len(rhs)):
-            if lhs[i] == rhs[j]:
+        cur[0] = i + 1
+        a: str = lhs[i]
+        for j in range(n):
+            if a == rhs[j]:
                 cost = 0
             else:
                 cost = 0.9
-            d[(i, j)] = min(
-                d[(i - 1, j)] + 1,
-                d[(i, j - 1)] + 1,
-                d[(i - 1, j - 1)] + cost,
+            d = min(
+                prev[j + 1] + 1,
+                cur[j] + 1,
+                prev[j] + cost,
             )
-            if i and j and lhs[i] == rhs[j - 1] and lhs[i - 1] == rhs[j]:
-                d[(i, j)] = min(d[(i, j)], d[i - 2, j - 2] + 1)
+            if i and j and a == rhs[j - 1] and lhs[i - 1] == rhs[j]:
+                d = min(d, before[j - 1] + 1)
+            cur[j + 1] = d
+
+        # Every later cell is at least the minimum of the last two rows,
+        # so the distance is known to exceed the bound.
+        cur_min: float = min(cur)
+        if cur_min > bound and prev_min > bound:
+            return min(cur_min, prev_min)
+        prev_min = cur_min
+
+        before, prev, cur = prev, cur, before if before else [0] * (n + 1)
+
+    return prev[n]
+
+
+def damerau_levenshtein_distances(word: str, candidates: List[str], bound: float = math.inf) -> np.ndarray:
+    # Same recurrence as damerau_levenshtein_distance, evaluated for all candidates at once
+    # over a padded code point matrix. Costs are kept in tenths so that integer arithmetic
+    # is exact; insertions along a row are resolved with a running minimum.
+    if not candidates:
+        return np.empty(0)
+
+    lengths: np.ndarray = np.fromiter((len(c) for c in candidates), dtype=np.int64, count=len(candidates))
+    width: int = int(lengths.max())
+    matrix: np.ndarray = np.zeros((len(candidates), width), dtype=np.uint32)
+    for k, candidate in enumerate(candidates):
+        matrix[k, :len(candidate)] = np.frombuffer(candidate.encode('utf-32-le'), dtype=np.uint32)
+
+    steps: np.ndarray = np.arange(width + 1, dtype=np.int64) * 10
+    limit: float = bound * 10
+    before: np.ndarray = np.empty(0)
+    prev: np.ndarray = np.broadcast_to(steps, (len(candidates), width + 1))
+    prev_min: np.ndarray = np.zeros(len(candidates), dtype=np.int64)
+
+    for i, ch in enumerate(word):
+        code: int = ord(ch)
+        equal: np.ndarray = matrix == code
+        cur: np.ndarray = np.empty_like(prev)
+        cur[:, 0] = (i + 1) * 10
+        cur[:, 1:] = np.minimum(prev[:, 1:] + 10, prev[:, :-1] + np.where(equal, 0, 9))
+        if i and width > 1:
+            swapped: np.ndarray = equal[:, :-1] & (matrix[:, 1:] == ord(word[i - 1]))
+            cur[:, 2:] = np.where(swapped, np.minimum(cur[:, 2:], before[:, :-2] + 10), cur[:, 2:])
+        cur = np.minimum.accumulate(cur - steps, axis=1) + steps
+
+        cur_min: np.ndarray = cur.min(axis=1)
+        if (cur_min > limit).all() and (prev_min > limit).all():
+            return np.minimum(cur_min, prev_min) / 10
+        prev_min = cur_min
+
+        before, prev = prev, cur
 
-    return d[len(lhs) - 1, len(rhs) - 1]
+    return prev[np.arange(len(candidates)), lengths] / 10
 
 
 def jaccard_coef(lhs: str, rhs: str):
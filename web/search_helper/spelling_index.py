@@ -0,0 +1,147 @@
+import heapq
+import time
+import numpy as np
+
+from array import array
+from datetime import timedelta
+from logging import Logger
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from bson.objectid import ObjectId
+
+from db import iterate_words
+
+from search_helper.common import get_ngrams
+from search_helper.metrics import jaccard_coef
+
+
+class SpellingIndex:
+    prefix_width: int = 16
+
+    def __init__(self, n: int = 2, refresh_period: float = 60, refresh_overlap: float = 30) -> None:
+        self.n = n
+        self.refresh_period = refresh_period
+        self.refresh_overlap = refresh_overlap
+        self.words: List[str] = []
+        self.word_ids: Dict[str, int] = dict()
+        self.postings: Dict[str, array] = dict()
+        self.lengths: array = array('I')
+        self.ngram_counts: array = array('I')
+        self.prefixes: bytearray = bytearray()
+        self.snapshot: Tuple = (0, np.empty(0), np.empty(0), np.empty((0, self.prefix_width)))
+        self.last_id: Optional[ObjectId] = None
+        self.last_refresh: float = 0
+        self.refreshing: bool = False
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.word_ids
+
+    def add(self, word: str) -> bool:
+        if word in self.word_ids:
+            return False
+
+        word_id: int = len(self.words)
+        self.words.append(word)
+        self.word_ids[word] = word_id
+        ngrams: Set[str] = get_ngrams(word, self.n)
+        self.lengths.append(len(word))
+        self.ngram_counts.append(len(ngrams))
+        self.prefixes += self.get_prefix(word).ljust(self.prefix_width, b'\0')
+        for ngram in ngrams:
+            postings: Optional[array] = self.postings.get(ngram)
+            if postings is None:
+                postings = self.postings[ngram] = array('I')
+            postings.append(word_id)
+        return True
+
+    def add_many(self, words: Iterable[str]) -> int:
+        return sum(self.add(word) for word in words)
+
+    def get_postings(self, ngram: str) -> array:
+        return self.postings.get(ngram, array('I'))
+
+    def get_candidates(self, word: str) -> Set[str]:
+        ids: Set[int] = set()
+        for ngram in get_ngrams(word, self.n):
+            ids.update(self.get_postings(ngram))
+        return {self.words[word_id] for word_id in ids}
+
+    def most_similar(self, word: str, k: int = 100) -> List[str]:
+        # Same ranking as sorting every candidate by (jaccard_coef, word) and keeping k,
+        # but jaccard_coef is only evaluated for candidates whose upper bound can still
+        # reach the top k. Shared n-gram counts come from merging the postings, which gives
+        # the exact n-gram part of the coefficient; positional matches are counted on the
+        # stored prefixes, so the bound is exact for words up to prefix_width characters.
+        ngrams: Set[str] = get_ngrams(word, self.n)
+        postings: List[np.ndarray] = [np.array(self.get_postings(ngram), dtype=np.uint32) for ngram in ngrams]
+        if not postings:
+            return []
+        ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+        if not len(ids):
+            return []
+        if self.n != 2:
+            scored = ((jaccard_coef(word, self.words[i]), self.words[i]) for i in ids.tolist())
+            return [w for _, w in heapq.nlargest(k, scored)]
+
+        _, lengths, ngram_counts, prefixes = self.get_snapshot()
+        lengths = lengths[ids]
+        length: int = len(word)
+        query: np.ndarray = np.frombuffer(self.get_prefix(word), dtype=np.uint8)
+        matches: np.ndarray = ((prefixes[ids, :len(query)] == query).sum(axis=1)
+                               + np.maximum(np.minimum(lengths, length) - self.prefix_width, 0))
+        bounds: np.ndarray = (0.5 * shared / (len(ngrams) + ngram_counts[ids] - shared)
+                              + 0.5 * matches / np.maximum(lengths, length))
+        order: np.ndarray = np.argsort(-bounds, kind='stable')
+
+        top: List[Tuple[float, str]] = []
+        for bound, word_id in zip(bounds[order].tolist(), ids[order].tolist()):
+            if len(top) == k and bound < top[0][0]:
+                break
+            other: str = self.words[word_id]
+            item: Tuple[float, str] = (jaccard_coef(word, other), other)
+            if len(top) < k:
+                heapq.heappush(top, item)
+            elif item > top[0]:
+                heapq.heapreplace(top, item)
+        return [w for _, w in sorted(top, reverse=True)]
+
+    def get_prefix(self, word: str) -> bytes:
+        # Characters are folded to one byte: collisions may only overcount matches,
+        # which keeps the bound valid.
+        return bytes(ord(c) & 0xFF for c in word[:self.prefix_width])
+
+    def get_snapshot(self) -> Tuple:
+        if self.snapshot[0] != len(self.words):
+            self.snapshot = (len(self.words),
+                             np.array(self.lengths, dtype=np.int64),
+                             np.array(self.ngram_counts, dtype=np.int64),
+                             np.frombuffer(bytes(self.prefixes), dtype=np.uint8).reshape(-1, self.prefix_width))
+        return self.snapshot
+
+    async def refresh(self, logger: Logger) -> int:
+        # The scraper inserts words with concurrent unordered upserts, so a word with a lower _id can
+        # become visible after a higher one was read: re-read a window behind the last _id,
+        # add() skips the words already known
+        after: Optional[ObjectId] = None
+        if self.last_id is not None:
+            after = ObjectId.from_datetime(self.last_id.generation_time - timedelta(seconds=self.refresh_overlap))
+        added: int = 0
+        async for record in iterate_words(after):
+            self.last_id = max(self.last_id, record['_id']) if self.last_id is not None else record['_id']
+            added += self.add(record['word'])
+        self.last_refresh = time.monotonic()
+        logger.debug("Spelling index: added %s words, %s words total", added, len(self))
+        return added
+
+    async def refresh_if_stale(self, logger: Logger) -> int:
+        # One refresh at a time: requests arriving while it reads Mongo use the index as it is
+        if self.refreshing or time.monotonic() - self.last_refresh < self.refresh_period:
+            return 0
+        self.refreshing = True
+        try:
+            return await self.refresh(logger)
+        finally:
+            self.refreshing = False
@@ -1 +1,5 @@
 from utils.settings import Settings
+from utils.lru_cache import LRUCache
+from utils.result_cache import ResultCache
+from common.metrics import Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE
+from common.profiler import SamplingProfiler
@@ -0,0 +1,73 @@
+import sys
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def deep_sizeof(obj: Any) -> int:
+    size: int = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k) + deep_sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v) for v in obj)
+    return size
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, max_bytes: Optional[int] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.data: OrderedDict = OrderedDict()
+        self.bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value, expires, _ = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        if expires is not None and expires < time.monotonic():
+            self.pop(key)
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self.pop(key)
+        expires: Optional[float] = time.monotonic() + self.ttl if self.ttl is not None else None
+        size: int = deep_sizeof(key) + deep_sizeof(value) if self.max_bytes is not None else 0
+        self.data[key] = (value, expires, size)
+        self.bytes += size
+        while len(self.data) > self.maxsize or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            _, (_, _, evicted) = self.data.popitem(last=False)
+            self.bytes -= evicted
+
+    def pop(self, key: Hashable) -> None:
+        entry = self.data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def clear(self) -> None:
+        self.data.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict:
+        lookups: int = self.hits + self.misses
+        return {
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,24 @@
+from typing import Any, Dict, Optional
+
+from utils.lru_cache import LRUCache
+
+
+class ResultCache(LRUCache):
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, max_bytes: Optional[int] = None) -> None:
+        super().__init__(maxsize, ttl=ttl, max_bytes=max_bytes)
+        self.generation: Optional[int] = None
+        self.invalidations: int = 0
+
+    def set_generation(self, generation: Optional[int]) -> None:
+        if generation is None or generation == self.generation:
+            return
+        if self.generation is not None:
+            self.clear()
+            self.invalidations += 1
+        self.generation = generation
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = super().stats()
+        result['generation'] = self.generation
+        result['invalidations'] = self.invalidations
+        return result
@@ -3,6 +3,33 @@ from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     secret: str
+    mongo_uri: str = 'mongodb://localhost:27017'
+    mongo_database: str = 'IR'
+    mongo_pool_size: int = 100
+    mongo_write_concern: str = '1'
+    mongo_read_preference: str = 'primary'
+    spelling_ngram: int = 2
+    spelling_refresh_period: float = 60
+    spelling_refresh_overlap: float = 30
+    correction_mode: str = 'bigram'
+    delete_index_path: str = 'delete_index'
+    delete_index_distance: int = 2
+    engine_url: str = 'http://localhost:8080'
+    engine_timeout: float = 10
+    engine_max_connections: int = 32
+    engine_batch_size: int = 64
+    request_timeout: float = 30
+    max_concurrency: int = 64
+    documents_cache_size: int = 10000
+    results_cache_size: int = 1000
+    results_cache_ttl: float = 300
+    results_cache_max_bytes: int = 64 * 2 ** 20
+    engine_generation_period: float = 30
+    warm_up: bool = True
+    stem_cache_size: int = 100000
+    admin_token: str = ''
+    profile_rate: float = 100
+    profile_seconds: float = 10
 
     class Config:
         env_file = '.env'